@@ -3,18 +3,19 @@
 import tkinter as tk
 from tkinter import filedialog, messagebox
 from qr_processor import (
-    process_data, generate_qr_code, generate_svg, optimise_svg,
-    determine_optimal_qr_version, extract_essential_ticket_details,
-    encode_ticket_details_to_cbor
+    process_data, generate_qr_code, generate_svg, optimise_svg, minify_svg,
+    determine_optimal_qr_version, extract_essential_ticket_details, SVGO_MIN_SIZE
 )
-from qr_decoder import decompress_data, decode_qr_image, decode_qr_data
-from qr_quality import check_qr_quality, optimize_qr_for_scanning
+from qr_json import json_loads, json_dumps
 import qrcode
 import logging
 import os
 import json
-from datetime import datetime
-from PIL import ImageTk, Image
+import threading
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from PIL import Image
 
 """
 This module implements the graphical user interface (GUI) for the QR Code Tool using Tkinter.
@@ -23,8 +24,14 @@ It handles:
   - Displaying options (such as compression method, error correction, theme, etc.).
   - Generating QR codes by calling functions in qr_processor.py.
   - Decoding QR codes by calling functions in qr_decoder.py.
+
+qr_decoder, qr_quality (which pull in OpenCV, NumPy and ZBar) and PIL.ImageTk are imported
+lazily inside the callbacks that need them, and qr_processor only imports NumPy when writing an
+SVG, so the main window appears without loading them.
 """
 
+logger = logging.getLogger(__name__)
+
 # Global Tkinter variables will be initialized after creating the root window.
 auto_save_var = None            # If True, QR codes are auto-saved in the "generated_qr" folder.
 output_format_var = None        # "png" or "svg"
@@ -36,10 +43,12 @@ auto_version_var = None         # Toggle for auto-selecting QR version.
 error_correction_var = None     # Selected error correction level ("L", "M", "Q", "H")
 preview_var = None              # Toggle to show a preview after QR generation.
 extract_essential_var = None    # Toggle to extract only essential JSON fields.
+fast_batch_var = None           # Toggle for fast (low compression) PNG output in batch mode.
 display_text = None             # Text widget to display decoded text or quality info.
 paste_text = None               # Text widget for pasting QR data.
 current_theme = None            # Stores the current theme: "light" or "dark"
 root = None                     # Root variable for the Tkinter   
+batch_progress_label = None     # Label showing the progress of a batch run.
 
 # Mapping for error correction levels.
 error_correction_mapping = {
@@ -48,6 +57,19 @@ error_correction_mapping = {
     "Q": qrcode.constants.ERROR_CORRECT_Q,
     "H": qrcode.constants.ERROR_CORRECT_H
 }
+# Error correction levels offered in the GUI and the constant used for unknown levels.
+ERROR_CORRECTION_LEVELS = tuple(error_correction_mapping)
+DEFAULT_ERROR_CORRECTION = error_correction_mapping["M"]
+
+# Output filename templates for single and batch generation.
+FILENAME_TEMPLATE = "qr_{}_{}_{}_{}_{}.{}"            # timestamp, use case, source type, Base64 flag, compression, extension
+BATCH_FILENAME_TEMPLATE = "{}_{}_{}_base64_{}.png"   # input base name, use case, source type, compression
+
+# Maximum size (width, height) of the preview window image.
+PREVIEW_MAX_SIZE = (512, 512)
+
+# Buffer size used when reading input files.
+READ_BUFFER_SIZE = 1 << 20
 
 # Define theme colors.
 LIGHT_BG = "#F5F5F5"
@@ -77,6 +99,26 @@ def toggle_theme():
     theme_var.set(new_theme)
     apply_theme(root, new_theme)
 
+def _debug_info(settings, plain=False):
+    """
+    Build the debug info string embedded in generated payloads.
+
+    :param settings: Dictionary with the "use_case", "compression", "error_correction"
+                     and "auto_version" settings.
+    :param plain: If True, return the "DEBUG: ...\\n" line prepended to plain text;
+                  otherwise return the value stored in JSON payloads.
+    :return: The debug info string.
+    """
+    debug_info = (
+        f"Use case: {settings['use_case']}, "
+        f"Compression: {settings['compression']}, "
+        f"Error Correction: {settings['error_correction']}, "
+        f"Auto QR Version: {settings['auto_version']}"
+    )
+    if plain:
+        return f"DEBUG: {debug_info}\n"
+    return debug_info
+
 def select_file(filetypes):
     """
     Open a file selection dialog.
@@ -86,6 +128,33 @@ def select_file(filetypes):
     """
     return filedialog.askopenfilename(filetypes=filetypes)
 
+def _payload_length(processed_data):
+    """
+    Return the size in bytes of a processed payload (as returned by process_data()).
+
+    :param processed_data: The processed payload as a string or bytes.
+    :return: The payload size in bytes.
+    """
+    if isinstance(processed_data, bytes):
+        return len(processed_data)
+    # ASCII text (including every Base64 payload) is one byte per character.
+    if processed_data.isascii():
+        return len(processed_data)
+    return len(processed_data.encode('utf-8'))
+
+def read_text_file(file_path):
+    """
+    Read a UTF‑8 text file and return its content with surrounding whitespace stripped.
+
+    The file is read as bytes in a single buffered call and stripped before decoding,
+    so only one decoded string is allocated.
+
+    :param file_path: Path to the file.
+    :return: The stripped file content as a string.
+    """
+    with open(file_path, "rb", buffering=READ_BUFFER_SIZE) as file:
+        return file.read().strip().decode("utf-8")
+
 def generate_filename(source_type="unknown"):
     """
     Generate a filename that includes a timestamp, source type, use case, Base64 flag, and compression method.
@@ -95,30 +164,37 @@ def generate_filename(source_type="unknown"):
     :param source_type: "json" or "txt"
     :return: A filename string.
     """
-    timestamp = datetime.now().strftime("%Y%m%dT%H%M%S")
+    timestamp = time.strftime("%Y%m%dT%H%M%S")
     use_case = use_case_var.get() if use_case_var else "unknown"
+    # Read each Tk variable once; every .get() is a round-trip into Tcl.
+    compression = compression_var.get() if compression_var else "none"
     # Force Base64 flag to "base64" for compressed data.
-    if compression_var.get() != "none":
+    if compression != "none":
         b64_flag = "base64"
     else:
         b64_flag = "base64" if base64_var.get() else "nobase64"
-    compression = compression_var.get() if compression_var else "none"
     ext = output_format_var.get() if output_format_var else "png"
     
-    return f"qr_{timestamp}_{use_case}_{source_type}_{b64_flag}_{compression}.{ext}"
+    return FILENAME_TEMPLATE.format(timestamp, use_case, source_type, b64_flag, compression, ext)
 
 def preview_qr_image(image):
     """
     Open a new window to display the QR code image.
+
+    Images larger than PREVIEW_MAX_SIZE are shrunk before being handed to Tkinter.
     
     :param image: PIL Image of the QR code.
     """
     preview_window = tk.Toplevel()
     preview_window.title("QR Code Preview")
+    # Downscale a copy for display; nearest-neighbour resampling keeps the modules crisp.
+    preview = image.copy()
+    preview.thumbnail(PREVIEW_MAX_SIZE, Image.NEAREST)
     # Convert the PIL image to a Tkinter-compatible image.
-    photo = ImageTk.PhotoImage(image)
+    from PIL import ImageTk
+    photo = ImageTk.PhotoImage(preview)
     label = tk.Label(preview_window, image=photo)
-    label.image = photo  # Keep a reference. Prevent garbage collection.
+    preview_window.photo = photo  # Keep a reference. Prevent garbage collection.
     label.pack()
 
 def generate_qr():
@@ -130,148 +206,141 @@ def generate_qr():
       2. If the compression method is "cbor" or if "Extract Essential JSON Details" is enabled,
          attempt to parse the input as JSON.
          - If parsing succeeds and "Extract Essential" is enabled, extract the essential fields.
-         - If "Include Debug Info" is enabled, insert a "debug" key (using an OrderedDict) so that
-           the debug info appears first in the JSON output.
+         - If "Include Debug Info" is enabled, insert a "debug" key (dicts preserve insertion
+           order) so that the debug info appears first in the JSON output.
       3. Otherwise, treat the input as plain text.
       4. Process the data using the selected compression method. (For compressed methods,
          Base64 encoding is forced.)
       5. Determine the optimal QR version and error correction.
       6. Generate the QR code image and save it.
       7. Optionally display a preview.
+
+    Only the file selection runs here. Steps 2-5 and the image generation run on a background
+    thread (see _generate_qr_worker) so the Tkinter event loop is not blocked; results are handed
+    back to the main thread with root.after(), as Tkinter must only be used from the main thread.
     """
     file_path = select_file([("Text and JSON Files", "*.txt;*.json")])
     if not file_path:
         messagebox.showerror("Error", "No file selected!")
         return
-    logging.debug(f"[generate_qr] Selected file: {file_path}")
+    logger.debug("[generate_qr] Selected file: %s", file_path)
+
+    # Snapshot the settings on the main thread; the worker thread must not touch Tkinter.
+    settings = {
+        "compression": compression_var.get(),
+        "extract_essential": extract_essential_var.get(),
+        "debug": debug_var.get(),
+        "use_case": use_case_var.get(),
+        "error_correction": error_correction_var.get(),
+        "auto_version": auto_version_var.get()
+    }
+    threading.Thread(target=_generate_qr_worker, args=(file_path, settings), daemon=True).start()
+
+def _generate_qr_worker(file_path, settings):
+    """
+    Read, process and encode the selected file into a QR code image (runs on a worker thread).
 
+    :param file_path: Path to the TXT or JSON input file.
+    :param settings: Dictionary with the generation settings snapshotted by generate_qr().
+    """
     # Read the file content as UTF‑8.
-    with open(file_path, "r", encoding="utf-8") as file:
-        data = file.read().strip()
+    data = read_text_file(file_path)
     if not data:
-        messagebox.showerror("Error", "File is empty or invalid!")
+        root.after(0, messagebox.showerror, "Error", "File is empty or invalid!")
         return
-    logging.debug(f"[generate_qr] Read {len(data)} characters from file.")
+    logger.debug("[generate_qr] Read %d characters from file.", len(data))
 
     # Decide how to process the input.
     # If the compression method is "cbor" or if extraction is enabled, try parsing as JSON.
-    if compression_var.get() == "cbor" or extract_essential_var.get():
+    if settings["compression"] == "cbor" or settings["extract_essential"]:
         try:
-            json_data = json.loads(data)
+            json_data = json_loads(data)
             source_type = "json"
-            if extract_essential_var.get():
+            if settings["extract_essential"]:
                 # Extract only the essential details from the full JSON.
                 essential_data = extract_essential_ticket_details(json_data)
                 # If debug info is enabled, add it as the first key.
-                if debug_var.get():
-                    from collections import OrderedDict
-                    debug_info = (
-                        f"Use case: {use_case_var.get()}, "
-                        f"Compression: {compression_var.get()}, "
-                        f"Error Correction: {error_correction_var.get()}, "
-                        f"Auto QR Version: {auto_version_var.get()}"
-                    )
-                    new_data = OrderedDict()
-                    new_data["debug"] = debug_info
-                    new_data.update(essential_data)
-                    essential_data = new_data
+                if settings["debug"]:
+                    debug_info = _debug_info(settings)
+                    essential_data = {"debug": debug_info, **essential_data}
                 # Convert the (optionally modified) JSON object to string.
-                data = json.dumps(essential_data)
-                logging.debug(f"[generate_qr] Essential details extracted: {data[:200]}")
+                data = json_dumps(essential_data)
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("[generate_qr] Essential details extracted: %s", data[:200])
             else:
-                if debug_var.get():
-                    from collections import OrderedDict
-                    debug_info = (
-                        f"Use case: {use_case_var.get()}, "
-                        f"Compression: {compression_var.get()}, "
-                        f"Error Correction: {error_correction_var.get()}, "
-                        f"Auto QR Version: {auto_version_var.get()}"
-                    )
-                    new_data = OrderedDict()
-                    new_data["debug"] = debug_info
-                    new_data.update(json_data)
-                    data = json.dumps(new_data)
-                    logging.debug(f"[generate_qr] Extended debug info added to JSON: {debug_info}")
+                if settings["debug"]:
+                    debug_info = _debug_info(settings)
+                    data = json_dumps({"debug": debug_info, **json_data})
+                    logger.debug("[generate_qr] Extended debug info added to JSON: %s", debug_info)
                 else:
-                    data = json.dumps(json_data)
+                    data = json_dumps(json_data)
         except json.JSONDecodeError:
             # Warn and fallback to plain text if JSON parsing fails.
-            messagebox.showwarning(
+            root.after(
+                0, messagebox.showwarning,
                 "Warning",
                 "Extraction is enabled but the input is not valid JSON.\nProceeding as plain text."
             )
             source_type = "txt"
-            if debug_var.get():
-                debug_info = (
-                    f"DEBUG: Use case: {use_case_var.get()}, "
-                    f"Compression: {compression_var.get()}, "
-                    f"Error Correction: {error_correction_var.get()}, "
-                    f"Auto QR Version: {auto_version_var.get()}\n"
-                )
+            if settings["debug"]:
+                debug_info = _debug_info(settings, plain=True)
                 data = debug_info + data
     else:
         # Attempt to parse JSON for debug info; if it fails, treat as plain text.
         try:
-            json.loads(data)
+            json_data = json_loads(data)
             source_type = "json"
-            if debug_var.get():
-                from collections import OrderedDict
-                debug_info = (
-                    f"Use case: {use_case_var.get()}, "
-                    f"Compression: {compression_var.get()}, "
-                    f"Error Correction: {error_correction_var.get()}, "
-                    f"Auto QR Version: {auto_version_var.get()}"
-                )
-                new_data = OrderedDict()
-                new_data["debug"] = debug_info
-                new_data.update(json.loads(data))
-                data = json.dumps(new_data)
-                logging.debug(f"[generate_qr] Extended debug info added to JSON: {data[:200]}")
+            if settings["debug"]:
+                debug_info = _debug_info(settings)
+                data = json_dumps({"debug": debug_info, **json_data})
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("[generate_qr] Extended debug info added to JSON: %s", data[:200])
         except json.JSONDecodeError:
             source_type = "txt"
-            if debug_var.get():
-                debug_info = (
-                    f"DEBUG: Use case: {use_case_var.get()}, "
-                    f"Compression: {compression_var.get()}, "
-                    f"Error Correction: {error_correction_var.get()}, "
-                    f"Auto QR Version: {auto_version_var.get()}\n"
-                )
+            if settings["debug"]:
+                debug_info = _debug_info(settings, plain=True)
                 data = debug_info + data
-                logging.debug(f"[generate_qr] Extended debug info prepended to TXT data: {data[:200]}")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("[generate_qr] Extended debug info prepended to TXT data: %s", data[:200])
 
     # Process the data using process_data().
-    processed_data = process_data(data, method=compression_var.get())
+    processed_data = process_data(data, method=settings["compression"])
     if processed_data is None:
-        messagebox.showerror("Error", "Data processing failed!")
+        root.after(0, messagebox.showerror, "Error", "Data processing failed!")
         return
 
-    # Log processed data length.
-    if isinstance(processed_data, bytes):
-        data_length = len(processed_data)
-    else:
-        data_length = len(processed_data.encode('utf-8'))
-    logging.debug(f"[generate_qr] Processed data length: {data_length} bytes")
-
-    # Determine the QR version.
-    if auto_version_var.get():
-        qr_version = determine_optimal_qr_version(data, compression_var.get(), "M")
-        logging.debug(f"[generate_qr] Auto QR version selected: {qr_version}")
+    # Determine the QR version from the size of the payload that is actually encoded.
+    if settings["auto_version"]:
+        data_length = _payload_length(processed_data)
+        logger.debug("[generate_qr] Processed data length: %d bytes", data_length)
+        qr_version = determine_optimal_qr_version(data_length, settings["compression"], settings["error_correction"])
+        logger.debug("[generate_qr] Auto QR version selected: %s", qr_version)
     else:
         qr_version = 5
-        logging.debug(f"[generate_qr] Fixed QR version used: {qr_version}")
+        logger.debug("[generate_qr] Fixed QR version used: %s", qr_version)
 
-    error_corr = error_correction_mapping.get(error_correction_var.get(), qrcode.constants.ERROR_CORRECT_M)
-    logging.debug(f"[generate_qr] Error Correction level: {error_correction_var.get()} -> {error_corr}")
+    error_corr = error_correction_mapping.get(settings["error_correction"], DEFAULT_ERROR_CORRECTION)
+    logger.debug("[generate_qr] Error Correction level: %s -> %s", settings["error_correction"], error_corr)
 
     # Generate the QR code image.
     try:
         qr_image = generate_qr_code(processed_data, qr_version=qr_version, error_correction=error_corr)
-        logging.debug(f"[generate_qr] QR code generated successfully.")
+        logger.debug("[generate_qr] QR code generated successfully.")
     except Exception as e:
-        logging.error(f"[generate_qr] QR generation failed: {e}")
-        messagebox.showerror("Error", f"QR Code generation failed: {e}")
+        logger.error("[generate_qr] QR generation failed: %s", e)
+        root.after(0, messagebox.showerror, "Error", f"QR Code generation failed: {e}")
         return
 
+    # Hand the generated image back to the main thread to choose a save path.
+    root.after(0, _save_generated_qr, qr_image, source_type)
+
+def _save_generated_qr(qr_image, source_type):
+    """
+    Determine where to save a generated QR code and start writing it (runs on the main thread).
+
+    :param qr_image: PIL Image of the generated QR code.
+    :param source_type: "json" or "txt"
+    """
     # Determine output format and save path.
     out_format = output_format_var.get().lower()
     if auto_save_var.get():
@@ -279,46 +348,56 @@ def generate_qr():
         os.makedirs(output_folder, exist_ok=True)
         filename = generate_filename(source_type=source_type)
         save_path = os.path.join(output_folder, filename)
-        logging.debug(f"[generate_qr] Auto-save enabled. Saving to: {save_path}")
+        logger.debug("[generate_qr] Auto-save enabled. Saving to: %s", save_path)
     else:
         save_path = filedialog.asksaveasfilename(
             defaultextension=f".{out_format}",
             filetypes=[("PNG Image", "*.png"), ("SVG Vector", "*.svg")]
         )
         if not save_path:
-            logging.debug("[generate_qr] Save cancelled by user.")
+            logger.debug("[generate_qr] Save cancelled by user.")
             return
-        logging.debug(f"[generate_qr] Save path chosen: {save_path}")
+        logger.debug("[generate_qr] Save path chosen: %s", save_path)
 
+    if out_format not in ("png", "svg"):
+        messagebox.showerror("Error", "Unsupported output format selected!")
+        return
+    threading.Thread(
+        target=_write_qr_worker,
+        args=(qr_image, out_format, save_path, preview_var.get()),
+        daemon=True
+    ).start()
+
+def _write_qr_worker(qr_image, out_format, save_path, show_preview):
+    """
+    Write a generated QR code to disk as PNG or SVG (runs on a worker thread).
+
+    :param qr_image: PIL Image of the generated QR code.
+    :param out_format: "png" or "svg"
+    :param save_path: Destination file path.
+    :param show_preview: If True, display a preview once the file has been saved.
+    """
     try:
         if out_format == "png":
             qr_image.save(save_path, optimize=True)
         elif out_format == "svg":
-            from qr_processor import generate_svg
-            qr_obj = qrcode.QRCode(
-                version=qr_version,
-                error_correction=error_corr,
-                box_size=4,
-                border=4
-            )
-            qr_obj.add_data(processed_data)
-            qr_obj.make(fit=True)
-            generate_svg(qr_obj, save_path)
-            # SVGO
-            optimise_svg(save_path)
-        else:
-            messagebox.showerror("Error", "Unsupported output format selected!")
-            return
-        logging.debug(f"[generate_qr] QR Code saved successfully at {save_path}")
+            # The generated image already carries the module matrix; no need to re-encode the data.
+            generate_svg(qr_image, save_path)
+            # Small files are minified in-process; starting SVGO would dominate the save time.
+            if os.path.getsize(save_path) < SVGO_MIN_SIZE:
+                minify_svg(save_path)
+            else:
+                optimise_svg(save_path)
+        logger.debug("[generate_qr] QR Code saved successfully at %s", save_path)
     except Exception as e:
-        logging.error(f"[generate_qr] Failed to save QR Code: {e}")
-        messagebox.showerror("Error", f"Failed to save QR Code: {e}")
+        logger.error("[generate_qr] Failed to save QR Code: %s", e)
+        root.after(0, messagebox.showerror, "Error", f"Failed to save QR Code: {e}")
         return
 
-    messagebox.showinfo("Success", f"QR Code saved at {save_path}")
-    if preview_var.get():
-        logging.debug(f"[generate_qr] Displaying preview.")
-        preview_qr_image(qr_image)
+    root.after(0, messagebox.showinfo, "Success", f"QR Code saved at {save_path}")
+    if show_preview:
+        logger.debug("[generate_qr] Displaying preview.")
+        root.after(0, preview_qr_image, qr_image)
 
 def decode_qr():
     """
@@ -330,24 +409,34 @@ def decode_qr():
       3. Automatically detect Base64 and compression (via decompress_data() with method "auto").
       4. Process further with decode_qr_data() to pretty-print JSON if applicable.
       5. Display the final result.
+
+    Steps 2-4 run on a background thread; the result is displayed via root.after().
     """
     file_path = select_file([("Image Files", "*.png;*.jpg;*.jpeg;*.bmp;*.tiff")])
     if not file_path:
         messagebox.showerror("Error", "No image file selected!")
         return
+    threading.Thread(target=_decode_qr_worker, args=(file_path,), daemon=True).start()
+
+def _decode_qr_worker(file_path):
+    """
+    Decode and decompress the QR code in 'file_path' (runs on a worker thread).
+
+    :param file_path: Path to the image file containing the QR code.
+    """
+    from qr_decoder import decompress_data, decode_qr_image, decode_qr_data
 
     # Decode the QR code from the image.
     decoded_data = decode_qr_image(file_path)
     if decoded_data is None:
-        messagebox.showerror("Error", "Failed to decode QR Code from the image!")
+        root.after(0, messagebox.showerror, "Error", "Failed to decode QR Code from the image!")
         return
 
     # Automatically decompress the data (auto-detects Base64 and compression).
     decompressed = decompress_data(decoded_data, method="auto")
     final_data = decode_qr_data(decompressed)
 
-    display_text.delete("1.0", tk.END)
-    display_text.insert(tk.END, f"Decoded Data:\n{final_data}")
+    root.after(0, show_output, f"Decoded Data:\n{final_data}")
 
 def assess_qr_quality():
     """
@@ -356,21 +445,43 @@ def assess_qr_quality():
       2. Optimize the image for scanning.
       3. Compute quality metrics (contrast, quiet zone, readability).
       4. Display the results.
+
+    Steps 2-3 run on a background thread; the result is displayed via root.after().
     """
     file_path = select_file([("Image Files", "*.png;*.jpg;*.jpeg;*.bmp;*.tiff")])
     if not file_path:
         messagebox.showerror("Error", "No image file selected!")
         return
+    threading.Thread(target=_assess_qr_quality_worker, args=(file_path,), daemon=True).start()
 
-    # Open the image file using PIL.
-    img = Image.open(file_path)
+def _assess_qr_quality_worker(file_path):
+    """
+    Optimise the image in 'file_path' and compute its quality metrics (runs on a worker thread).
+
+    :param file_path: Path to the image file containing the QR code.
+    """
+    import numpy as np
+    from qr_quality import check_qr_quality, optimize_qr_for_scanning
+
+    # Open the image file using PIL and convert it to a grayscale array once; the optimisation
+    # and quality checks below all work on that array.
+    with Image.open(file_path) as img:
+        gray_array = np.asarray(img.convert("L"))
     # Optimize the image for scanning.
-    optimized_img = optimize_qr_for_scanning(img)
+    optimized_array = optimize_qr_for_scanning(gray_array, return_array=True)
     # Get the quality assessment details.
-    quality_info = check_qr_quality(optimized_img)
+    quality_info = check_qr_quality(optimized_array)
+
+    root.after(0, show_output, f"QR Quality Assessment:\n{quality_info}")
+
+def show_output(text):
+    """
+    Replace the contents of the output text widget (must be called on the main thread).
 
+    :param text: The text to display.
+    """
     display_text.delete("1.0", tk.END)
-    display_text.insert(tk.END, f"QR Quality Assessment:\n{quality_info}")
+    display_text.insert(tk.END, text)
 
 def paste_qr_data():
     """
@@ -381,6 +492,7 @@ def paste_qr_data():
     if not raw_qr:
         messagebox.showerror("Error", "No QR data pasted!")
         return
+    from qr_decoder import decompress_data
     decoded = decompress_data(raw_qr, method=compression_var.get())
     display_text.delete("1.0", tk.END)
     display_text.insert(tk.END, f"Decoded Data:\n{decoded}")
@@ -400,69 +512,131 @@ def save_decoded_text():
         f.write(decoded)
     messagebox.showinfo("Success", f"Decoded text saved to {file_path}")
 
+def _process_one(file_path, opts):
+    """
+    Generate and save a QR code for a single batch input file.
+
+    This runs in a worker process, so all settings are passed in as plain values
+    (Tkinter variables cannot be pickled). Nothing is logged here; failures are reported
+    in the return value and logged by the GUI process.
+
+    :param file_path: Path to the TXT or JSON input file.
+    :param opts: Dictionary with the "debug", "use_case", "compression", "auto_version",
+                 "error_correction", "fast_png" and "output_folder" settings.
+    :return: Tuple (ok, save_path, error); save_path is None if the file was skipped or failed,
+             error is a message for the log if it failed, otherwise None.
+    """
+    filename = os.path.basename(file_path)
+    try:
+        data = read_text_file(file_path)
+    except Exception as e:
+        return False, None, f"Failed to read {filename}: {e}"
+    if not data:
+        return False, None, None
+    try:
+        data_json = json_loads(data)
+        source_type = "json"
+        if opts["debug"]:
+            debug_info = _debug_info(opts)
+            data_json["gen_ver"] = debug_info
+            data = json_dumps(data_json)
+    except json.JSONDecodeError:
+        source_type = "txt"
+        if opts["debug"]:
+            debug_info = _debug_info(opts, plain=True)
+            data = debug_info + data
+    processed_data = process_data(data, method=opts["compression"])
+    if processed_data is None:
+        return False, None, f"Failed to process data for {filename}"
+    if opts["auto_version"]:
+        qr_version = determine_optimal_qr_version(_payload_length(processed_data), opts["compression"], opts["error_correction"])
+    else:
+        qr_version = 5
+    try:
+        error_corr = error_correction_mapping.get(opts["error_correction"], DEFAULT_ERROR_CORRECTION)
+        qr_image = generate_qr_code(processed_data, qr_version=qr_version, error_correction=error_corr)
+    except Exception as e:
+        return False, None, f"QR generation failed for {filename}: {e}"
+    base = os.path.splitext(filename)[0]
+    new_filename = BATCH_FILENAME_TEMPLATE.format(base, opts["use_case"], source_type, opts["compression"])
+    save_path = os.path.join(opts["output_folder"], new_filename)
+    try:
+        if opts["fast_png"]:
+            # QR codes compress well even at the lowest level; skip the slow optimizing passes.
+            qr_image.save(save_path, format="PNG", compress_level=1, optimize=False)
+        else:
+            qr_image.save(save_path, optimize=True)
+    except Exception as e:
+        return False, None, f"Failed to save QR Code for {filename}: {e}"
+    return True, save_path, None
+
 def batch_generate_qr():
     """
     Batch process all TXT/JSON files in a selected folder to generate QR codes.
     
-    Each file is processed with the current settings and saved automatically.
+    Each file is processed with the current settings and saved automatically. Files are
+    processed in parallel by a pool of worker processes; progress is reported back to the
+    Tkinter main loop via root.after() so the UI stays responsive during the run.
     """
-    global debug_var, use_case_var, compression_var, auto_version_var, error_correction_var
+    global debug_var, use_case_var, compression_var, auto_version_var, error_correction_var, fast_batch_var
     folder_path = filedialog.askdirectory(title="Select Folder with Input Files")
     if not folder_path:
         messagebox.showerror("Error", "No folder selected!")
         return
-    files = [f for f in os.listdir(folder_path) if f.lower().endswith((".txt", ".json"))]
-    if not files:
+    with os.scandir(folder_path) as entries:
+        paths = [
+            entry.path for entry in entries
+            if entry.is_file() and entry.name.lower().endswith((".txt", ".json"))
+        ]
+    if not paths:
         messagebox.showinfo("Info", "No TXT or JSON files found in the folder.")
         return
     output_folder = os.path.join(os.getcwd(), "generated_qr")
     os.makedirs(output_folder, exist_ok=True)
-    count = 0
-    for filename in files:
-        file_path = os.path.join(folder_path, filename)
-        try:
-            with open(file_path, "r", encoding="utf-8") as file:
-                data = file.read().strip()
-        except Exception as e:
-            logging.error(f"Failed to read {filename}: {e}")
-            continue
-        if not data:
-            continue
-        try:
-            json.loads(data)
-            source_type = "json"
-            if debug_var.get():
-                data_json = json.loads(data)
-                debug_info = f"Use case: {use_case_var.get()}, Compression: {compression_var.get()}"
-                data_json["gen_ver"] = debug_info
-                data = json.dumps(data_json)
-        except json.JSONDecodeError:
-            source_type = "txt"
-            if debug_var.get():
-                debug_info = f"DEBUG: Use case: {use_case_var.get()}, Compression: {compression_var.get()}\n"
-                data = debug_info + data
-        processed_data = process_data(data, method=compression_var.get())
-        if processed_data is None:
-            continue
-        if auto_version_var.get():
-            qr_version = determine_optimal_qr_version(data, compression_var.get(), "M")
-        else:
-            qr_version = 5
-        error_corr = error_correction_mapping.get(error_correction_var.get(), qrcode.constants.ERROR_CORRECT_M)
-        try:
-            qr_image = generate_qr_code(processed_data, qr_version=qr_version, error_correction=error_corr)
-        except Exception as e:
-            logging.error(f"QR generation failed for {filename}: {e}")
-            continue
-        base = os.path.splitext(filename)[0]
-        new_filename = f"{base}_{use_case_var.get()}_{source_type}_base64_{compression_var.get()}.png"
-        save_path = os.path.join(output_folder, new_filename)
+
+    # Snapshot the settings up front; worker processes cannot access Tkinter variables.
+    opts = {
+        "debug": debug_var.get(),
+        "use_case": use_case_var.get(),
+        "compression": compression_var.get(),
+        "auto_version": auto_version_var.get(),
+        "error_correction": error_correction_var.get(),
+        "fast_png": fast_batch_var.get(),
+        "output_folder": output_folder
+    }
+    total = len(paths)
+    progress = {"done": 0, "count": 0}
+
+    def on_result(ok):
+        # Runs on the Tkinter main loop.
+        progress["done"] += 1
+        if ok:
+            progress["count"] += 1
+        batch_progress_label.config(text=f"Batch progress: {progress['done']}/{total}")
+        if progress["done"] == total:
+            messagebox.showinfo("Batch Generation", f"Generated QR codes for {progress['count']} files.")
+
+    def on_done(future):
+        # Runs on the executor's management thread; hand the result to the main loop.
         try:
-            qr_image.save(save_path, optimize=True)
-            count += 1
+            ok, _, error = future.result()
         except Exception as e:
-            logging.error(f"Failed to save QR Code for {filename}: {e}")
-    messagebox.showinfo("Batch Generation", f"Generated QR codes for {count} files.")
+            ok, error = False, f"Batch worker failed: {e}"
+        if error:
+            logger.error("%s", error)
+        root.after(0, on_result, ok)
+
+    batch_progress_label.config(text=f"Batch progress: 0/{total}")
+    # Spawn the workers rather than forking: forking while the log listener and Tkinter threads
+    # are running can copy a held lock into the child and deadlock it.
+    executor = ProcessPoolExecutor(
+        max_workers=os.cpu_count(),
+        mp_context=multiprocessing.get_context("spawn")
+    )
+    for path in paths:
+        executor.submit(_process_one, path, opts).add_done_callback(on_done)
+    # Do not block the main loop waiting for the workers; they finish in the background.
+    executor.shutdown(wait=False)
 
 def main():
     """
@@ -471,7 +645,7 @@ def main():
     Initializes the Tkinter root window, sets up global variables and widgets,
     and starts the event loop.
     """
-    global root, theme_var, auto_save_var, output_format_var, use_case_var, compression_var, base64_var, debug_var, auto_version_var, error_correction_var, preview_var, display_text, paste_text, current_theme, extract_essential_var
+    global root, theme_var, auto_save_var, output_format_var, use_case_var, compression_var, base64_var, debug_var, auto_version_var, error_correction_var, preview_var, display_text, paste_text, current_theme, extract_essential_var, fast_batch_var, batch_progress_label
 
     # Create the main window.
     root = tk.Tk()
@@ -488,23 +662,24 @@ def main():
     error_correction_var = tk.StringVar(master=root, value="M")
     preview_var = tk.BooleanVar(master=root, value=True)
     extract_essential_var = tk.BooleanVar(master=root, value=True)
+    fast_batch_var = tk.BooleanVar(master=root, value=True)
     theme_var = tk.StringVar(value="light")
 
     # Apply the initial theme.
     apply_theme(root, theme_var.get())
 
     # Log changes for the auto-save toggle.
-    auto_save_var.trace_add("write", lambda *args: logging.debug(f"Auto-save toggled, new value: {auto_save_var.get()}"))
+    auto_save_var.trace_add("write", lambda *args: logger.debug("Auto-save toggled, new value: %s", auto_save_var.get()))
     # Log changes for the preview toggle.
-    preview_var.trace_add("write", lambda *args: logging.debug(f"Preview toggled, new value: {preview_var.get()}"))
+    preview_var.trace_add("write", lambda *args: logger.debug("Preview toggled, new value: %s", preview_var.get()))
     # Log changes for the extraction toggle.
-    extract_essential_var.trace_add("write", lambda *args: logging.debug(f"Extract essential JSON toggled, new value: {extract_essential_var.get()}"))
+    extract_essential_var.trace_add("write", lambda *args: logger.debug("Extract essential JSON toggled, new value: %s", extract_essential_var.get()))
     # Log changes for the debug info toggle.
-    debug_var.trace_add("write", lambda *args: logging.debug(f"Debug info toggled, new value: {debug_var.get()}"))
+    debug_var.trace_add("write", lambda *args: logger.debug("Debug info toggled, new value: %s", debug_var.get()))
     # Log changes for the theme toggle.
-    theme_var.trace_add("write", lambda *args: logging.debug(f"Theme changed, new value: {theme_var.get()}"))
+    theme_var.trace_add("write", lambda *args: logger.debug("Theme changed, new value: %s", theme_var.get()))
     # Log changes for the auto QR version toggle.
-    auto_version_var.trace_add("write", lambda *args: logging.debug(f"Auto QR version toggled, new value: {auto_version_var.get()}"))
+    auto_version_var.trace_add("write", lambda *args: logger.debug("Auto QR version toggled, new value: %s", auto_version_var.get()))
 
     # Build the options frame.
     frame_options = tk.Frame(root)
@@ -515,9 +690,10 @@ def main():
     tk.Checkbutton(frame_options, text="Include Debug Info", variable=debug_var).grid(row=2, column=0, sticky="w", padx=5, pady=2)
     tk.Checkbutton(frame_options, text="Use Auto QR Version", variable=auto_version_var).grid(row=3, column=0, sticky="w", padx=5, pady=2)
     tk.Label(frame_options, text="Error Correction:").grid(row=4, column=0, sticky="w", padx=5, pady=2)
-    tk.OptionMenu(frame_options, error_correction_var, "L", "M", "Q", "H").grid(row=4, column=1, sticky="w", padx=5, pady=2)
+    tk.OptionMenu(frame_options, error_correction_var, *ERROR_CORRECTION_LEVELS).grid(row=4, column=1, sticky="w", padx=5, pady=2)
     tk.Checkbutton(frame_options, text="Show Preview", variable=preview_var).grid(row=5, column=0, sticky="w", padx=5, pady=2)
     tk.Checkbutton(frame_options, text="Extract Essential JSON Details", variable=extract_essential_var).grid(row=7, column=0, sticky="w", padx=5, pady=2)
+    tk.Checkbutton(frame_options, text="Fast Batch PNG Compression", variable=fast_batch_var).grid(row=8, column=0, sticky="w", padx=5, pady=2)
     tk.Button(frame_options, text="Toggle Theme", command=toggle_theme).grid(row=6, column=0, sticky="w", padx=5, pady=2)
 
     # Compression options frame.
@@ -530,6 +706,8 @@ def main():
     btn_generate = tk.Button(root, text="Generate QR Code", command=generate_qr)
     btn_generate.pack(padx=10, pady=5)
     tk.Button(root, text="Batch Generate QR Codes", command=batch_generate_qr).pack(padx=10, pady=5)
+    batch_progress_label = tk.Label(root, text="")
+    batch_progress_label.pack(padx=10)
     btn_decode = tk.Button(root, text="Decode QR Image", command=decode_qr)
     btn_decode.pack(padx=10, pady=5)
     btn_assess = tk.Button(root, text="Assess QR Quality", command=assess_qr_quality)
@@ -2,35 +2,63 @@
 
 import gui
 import logging
+import logging.handlers
+import queue
 import sys
-import codecs
 
 """
 This is the entry point of the application. It configures logging and launches the GUI.
+
+Log records are put on a queue by a QueueHandler and written to the file and stream handlers by a
+QueueListener running on a background thread, so the GUI never waits for disk or console I/O.
 """
 
-# Remove any previously configured handlers.
-for handler in logging.root.handlers[:]:
-    logging.root.removeHandler(handler)
-
-# Create a StreamHandler that writes to sys.stdout with UTF‑8 encoding.
-stream_handler = logging.StreamHandler(sys.stdout)
-stream_handler.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s - %(message)s"))
-# Wrap sys.stdout so that the handler writes using UTF-8.
-stream_handler.stream = open(sys.stdout.fileno(), mode='w', encoding='utf-8', buffering=1)
-
-# Configure logging to write both to a file (with UTF-8) and the stream handler.
-logging.basicConfig(
-    level=logging.DEBUG,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.FileHandler("qr_processor.log", encoding='utf-8'),
-        stream_handler
-    ]
-)
+def configure_logging():
+    """
+    Route all log records through a queue to the log file and stdout.
+
+    This runs from main() rather than at import time: batch worker processes are spawned and
+    re-import the main module, and they must not reopen the log file, reconfigure stdout or
+    install a QueueHandler whose queue only the GUI process reads.
+
+    :return: The QueueListener that writes the queued records; the caller starts and stops it.
+    """
+    # Remove any previously configured handlers.
+    for handler in logging.root.handlers[:]:
+        logging.root.removeHandler(handler)
+
+    # Switch sys.stdout to UTF‑8 in place, keeping its default buffering (no flush per record).
+    try:
+        sys.stdout.reconfigure(encoding='utf-8')
+    except AttributeError:
+        # sys.stdout has been replaced by a stream without reconfigure(); keep it as-is.
+        pass
+
+    # Create a StreamHandler that writes to sys.stdout with UTF‑8 encoding.
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s - %(message)s"))
+
+    file_handler = logging.FileHandler("qr_processor.log", encoding='utf-8')
+    file_handler.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s - %(message)s"))
+
+    # Configure logging to enqueue records; the listener writes them to the file (with UTF-8)
+    # and the stream handler.
+    log_queue = queue.Queue(-1)
+    logging.basicConfig(
+        level=logging.DEBUG,
+        format="%(message)s",  # Final formatting is done by the listener's handlers.
+        handlers=[logging.handlers.QueueHandler(log_queue)]
+    )
+    return logging.handlers.QueueListener(log_queue, file_handler, stream_handler)
 
 def main():
-    gui.main()
+    log_listener = configure_logging()
+    log_listener.start()
+    try:
+        gui.main()
+    finally:
+        # Flush any queued records once the GUI has been closed.
+        log_listener.stop()
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
@@ -1,16 +1,28 @@
 # qr_decoder.py
 
-import re
 import json
 import base64
 import zlib
-import gzip
-import cbor2
 import logging
 import cv2
 import numpy as np
-from pyzbar.pyzbar import decode
+from pyzbar.pyzbar import decode, ZBarSymbol
 from PIL import Image
+from qr_json import json_loads, json_dumps_pretty
+
+try:
+    import pybase64
+except ImportError:  # pybase64 is optional; fall back to the standard library.
+    pybase64 = None
+
+# Use the SIMD-accelerated decoder when available; both accept str or bytes input.
+_b64decode = pybase64.b64decode if pybase64 is not None else base64.b64decode
+
+try:
+    # Call the C decoder directly when cbor2 ships it as a separate extension module.
+    from _cbor2 import loads as _cbor_loads
+except ImportError:
+    from cbor2 import loads as _cbor_loads
 
 """
 This module provides functions for decoding QR codes:
@@ -23,24 +35,30 @@ This module provides functions for decoding QR codes:
   - decode_json_qr() and decode_qr_data() provide additional JSON processing.
 """
 
+logger = logging.getLogger(__name__)
+
+# The standard Base64 alphabet (without padding), used as a bytes.translate() deletion table.
+_B64_ALPHABET = b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/"
+
 def is_base64_string(s):
     """
-    Check if the string 's' appears to be Base64‑encoded using a round‑trip check.
+    Check if the string 's' appears to be Base64‑encoded.
+
+    The string must consist of Base64 alphabet characters followed by at most two '=' padding
+    characters, with a total length that is a multiple of 4. The alphabet check is a single
+    bytes.translate() pass that deletes every alphabet byte; nothing may be left over.
     
     :param s: Input string.
     :return: True if s is Base64‑encoded; otherwise False.
     """
     s = s.strip()
-    if len(s) % 4 != 0:
-        return False
-    if not re.fullmatch(r'^[A-Za-z0-9+/]+={0,2}$', s):
+    if not s or len(s) % 4 != 0 or not s.isascii():
         return False
-    try:
-        decoded = base64.b64decode(s, validate=True)
-        reencoded = base64.b64encode(decoded).decode('utf-8')
-        return reencoded.rstrip('=') == s.rstrip('=')
-    except Exception:
+    encoded = s.encode('ascii')
+    body = encoded.rstrip(b'=')
+    if not body or len(encoded) - len(body) > 2:
         return False
+    return not body.translate(None, _B64_ALPHABET)
 
 def decompress_data(data, method="auto"):
     """
@@ -50,9 +68,8 @@ def decompress_data(data, method="auto"):
     Otherwise, it:
       1. Checks if the data is Base64‑encoded; if not, it returns the input.
       2. Decodes the data from Base64.
-      3. If method=="auto", auto-detects compression based on header bytes:
-            - gzip if the bytes start with 0x1f8b,
-            - zlib if the first two bytes match common zlib headers,
+      3. If method=="auto", auto-detects the encoding:
+            - gzip or zlib if zlib can decompress the bytes (it recognises both headers),
             - otherwise attempts CBOR decoding.
       4. Decompresses (or decodes CBOR) accordingly and returns a UTF‑8 string.
     
@@ -61,61 +78,77 @@ def decompress_data(data, method="auto"):
     :return: Decompressed data as a UTF‑8 string.
     """
     if method == "none":
-        logging.debug("[decompress_data] Method 'none' provided; returning plain text.")
+        logger.debug("[decompress_data] Method 'none' provided; returning plain text.")
         return data
 
-    logging.debug(f"[decompress_data] Received data (first 100 chars): {repr(data[:100])}")
-    logging.debug(f"[decompress_data] Initial method parameter: {method}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("[decompress_data] Received data (first 100 chars): %r", data[:100])
+        logger.debug("[decompress_data] Initial method parameter: %s", method)
 
     # Check if the data is Base64‑encoded automatically.
     if not is_base64_string(data):
-        logging.debug("[decompress_data] No Base64 encoding detected; treating data as plain text.")
+        logger.debug("[decompress_data] No Base64 encoding detected; treating data as plain text.")
         return data
 
     try:
-        data_bytes = base64.b64decode(data.encode('utf-8'))
-        logging.debug(f"[decompress_data] After Base64 decode: {len(data_bytes)} bytes; Header: {data_bytes[:4].hex()}")
+        data_bytes = _b64decode(data)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("[decompress_data] After Base64 decode: %d bytes; Header: %s", len(data_bytes), data_bytes[:4].hex())
     except Exception as e:
-        logging.error(f"[decompress_data] Base64 decoding failed: {e}")
+        logger.error("[decompress_data] Base64 decoding failed: %s", e)
         return data
 
-    # If method is auto, detect compression by inspecting header bytes.
+    # If method is auto, let zlib detect a zlib or gzip stream itself (wbits=47 accepts both
+    # headers) and otherwise probe for CBOR. The detection keeps what it decoded, so the payload
+    # is not decoded a second time below.
+    inflated = probed = None
     if method == "auto":
-        if data_bytes.startswith(b'\x1f\x8b'):
-            method = "gzip"
-        elif data_bytes[:2] in (b'\x78\x01', b'\x78\x5e', b'\x78\x9c', b'\x78\xda'):
-            method = "zlib"
-        else:
+        try:
+            inflated = zlib.decompress(data_bytes, wbits=47, bufsize=len(data_bytes) * 4)
+            method = "gzip" if data_bytes.startswith(b'\x1f\x8b') else "zlib"
+        except zlib.error:
             try:
-                _ = cbor2.loads(data_bytes)
+                probed = _cbor_loads(data_bytes)
                 method = "cbor"
             except Exception:
                 method = "none"
-        logging.debug(f"[decompress_data] Auto-detected compression method: {method}")
+        logger.debug("[decompress_data] Auto-detected compression method: %s", method)
 
     try:
         if method == "none":
             return data_bytes.decode('utf-8')
         elif method == "zlib":
-            decompressed = zlib.decompress(data_bytes)
-            logging.debug(f"[decompress_data] After zlib decompression: {len(decompressed)} bytes")
+            if inflated is None:
+                # Pre-size the output buffer; text typically compresses to well under a quarter.
+                decompressed = zlib.decompress(data_bytes, bufsize=len(data_bytes) * 4)
+            else:
+                decompressed = inflated
+            logger.debug("[decompress_data] After zlib decompression: %d bytes", len(decompressed))
             return decompressed.decode('utf-8')
         elif method == "gzip":
-            decompressed = gzip.decompress(data_bytes)
-            logging.debug(f"[decompress_data] After gzip decompression: {len(decompressed)} bytes")
+            if inflated is None:
+                # wbits=31 makes zlib parse the gzip header and trailer itself, skipping gzip.GzipFile.
+                decompressed = zlib.decompress(data_bytes, wbits=31)
+            else:
+                decompressed = inflated
+            logger.debug("[decompress_data] After gzip decompression: %d bytes", len(decompressed))
             return decompressed.decode('utf-8')
         elif method == "cbor":
-            result = cbor2.loads(data_bytes)
-            decompressed = json.dumps(result, indent=4)
-            logging.debug(f"[decompress_data] After CBOR decoding: {len(decompressed.encode('utf-8'))} bytes")
+            result = probed if probed is not None else _cbor_loads(data_bytes)
+            decompressed = json_dumps_pretty(result)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("[decompress_data] After CBOR decoding: %d bytes", len(decompressed.encode('utf-8')))
             return decompressed
         else:
-            logging.error(f"[decompress_data] Unknown method: {method}")
+            logger.error("[decompress_data] Unknown method: %s", method)
             return data_bytes.decode('utf-8', errors='replace')
     except Exception as e:
-        logging.error(f"[decompress_data] Decompression error for method {method}: {e}")
+        logger.error("[decompress_data] Decompression error for method %s: %s", method, e)
         return data_bytes.decode('utf-8', errors='replace')
 
+# Symbologies passed to ZBar when scanning images.
+_QR_SYMBOLS = (ZBarSymbol.QRCODE,)
+
 def decode_qr_image(file_path):
     """
     Load an image from 'file_path', detect the first QR code, and return its decoded data as a string.
@@ -125,23 +158,25 @@ def decode_qr_image(file_path):
     :param file_path: Path to the image file containing the QR code.
     :return: Decoded QR code data as a string.
     """
-    image = cv2.imread(file_path)
-    if image is None:
-        logging.error("Could not read image.")
+    # Decode straight to a single grayscale channel; no BGR buffer or colour conversion needed.
+    gray = cv2.imread(file_path, cv2.IMREAD_GRAYSCALE)
+    if gray is None:
+        logger.error("Could not read image.")
         return None
 
-    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-    qr_codes = decode(gray)
+    # Only enable the QR symbology, so ZBar skips its linear (1D) barcode scanners.
+    qr_codes = decode(gray, symbols=_QR_SYMBOLS)
     if not qr_codes:
-        logging.error("No QR code detected in the image.")
+        logger.error("No QR code detected in the image.")
         return None
 
     raw_data = qr_codes[0].data  # Raw bytes from the QR code.
     try:
         decoded_str = raw_data.decode("utf-8").strip()
-        logging.debug(f"[decode_qr_image] Decoded using UTF-8: {decoded_str[:100]}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("[decode_qr_image] Decoded using UTF-8: %s", decoded_str[:100])
     except Exception as e:
-        logging.error(f"[decode_qr_image] UTF-8 decoding failed: {e}. Falling back to Latin-1.")
+        logger.error("[decode_qr_image] UTF-8 decoding failed: %s. Falling back to Latin-1.", e)
         decoded_str = raw_data.decode("latin1", errors="replace").strip()
     
     return decoded_str
@@ -154,10 +189,10 @@ def decode_json_qr(data):
     :return: Parsed JSON object (dictionary) or None if decoding fails.
     """
     try:
-        parsed_data = json.loads(data)
+        parsed_data = json_loads(data)
         return parsed_data
     except json.JSONDecodeError:
-        logging.error("Failed to decode JSON.")
+        logger.error("Failed to decode JSON.")
         return None
 
 def decode_qr_data(data):
@@ -169,9 +204,9 @@ def decode_qr_data(data):
     :return: Pretty-printed JSON string or the original string.
     """
     try:
-        parsed = json.loads(data)
+        parsed = json_loads(data)
         if isinstance(parsed, dict) and "gen_ver" in parsed:
             del parsed["gen_ver"]
-        return json.dumps(parsed, indent=4)
+        return json_dumps_pretty(parsed)
     except Exception as e:
         return data
\ No newline at end of file
@@ -0,0 +1,106 @@
+# qr_json.py
+
+import json
+import math
+import re
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the standard library.
+    orjson = None
+
+"""
+This module provides the JSON helpers shared by the GUI and the decoder:
+  - json_loads() parses JSON text, using orjson when it can do so without changing the data.
+  - json_dumps() serialises an object to a compact JSON string.
+  - json_dumps_pretty() serialises an object to an indented JSON string for display.
+
+orjson reads integers beyond 64 bits as floats, rejects NaN and Infinity, refuses to encode
+integers beyond 64 bits and writes NaN and Infinity as null. In each of those cases the standard
+library json module is used instead, so the result does not depend on whether orjson is installed.
+"""
+
+# Integer literals this long may not fit in 64 bits, which orjson would turn into a float.
+_LONG_INT_RE = re.compile(r"[0-9]{19,}")
+
+def _has_non_finite(obj):
+    """
+    Check whether a decoded JSON structure contains NaN or an infinite float.
+
+    :param obj: A dict, list, tuple or scalar value.
+    :return: True if a non-finite float is found (in a value or a key).
+    """
+    if isinstance(obj, float):
+        return not math.isfinite(obj)
+    if isinstance(obj, dict):
+        return any(_has_non_finite(key) or _has_non_finite(value) for key, value in obj.items())
+    if isinstance(obj, (list, tuple)):
+        return any(map(_has_non_finite, obj))
+    return False
+
+def _orjson_dumps(obj, option=None):
+    """
+    Serialise an object with orjson, or return None if orjson would not reproduce it exactly.
+
+    orjson raises TypeError for integers beyond 64 bits and writes NaN and Infinity as null.
+    Non-finite floats can only be the source of a null in the output, so the structure is only
+    searched for them when the output contains one.
+
+    :param obj: The object to serialise.
+    :param option: orjson option flags.
+    :return: The serialised bytes, or None if the standard library should be used instead.
+    """
+    if orjson is None:
+        return None
+    try:
+        dumped = orjson.dumps(obj, option=option)
+    except TypeError:
+        return None
+    if b"null" in dumped and _has_non_finite(obj):
+        return None
+    return dumped
+
+def json_loads(data):
+    """
+    Parse a JSON string, using orjson when it can do so without changing the data.
+
+    The standard library parser is used for text containing integer literals that may exceed
+    64 bits (orjson reads them as floats) and for text orjson rejects but json accepts (e.g. NaN).
+    Either way a failure raises json.JSONDecodeError (which orjson.JSONDecodeError subclasses).
+
+    :param data: The JSON text.
+    :return: The parsed object.
+    """
+    if orjson is not None and not _LONG_INT_RE.search(data):
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(data)
+
+def json_dumps(obj):
+    """
+    Serialise an object to a compact JSON string, with non-ASCII text kept as is.
+
+    :param obj: The object to serialise.
+    :return: The JSON string.
+    """
+    dumped = _orjson_dumps(obj)
+    if dumped is not None:
+        return dumped.decode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+def json_dumps_pretty(obj):
+    """
+    Serialise an object to a JSON string indented by 2 spaces, with non-ASCII text kept as is.
+
+    Non-string keys (which CBOR allows) are converted to strings, as json.dumps does.
+
+    :param obj: The object to serialise.
+    :return: The JSON string.
+    """
+    if orjson is not None:
+        dumped = _orjson_dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+        if dumped is not None:
+            return dumped.decode("utf-8")
+    return json.dumps(obj, indent=2, ensure_ascii=False)
@@ -5,10 +5,32 @@ import qrcode
 import zlib
 import gzip
 import base64
-import cbor2
+import io
 import subprocess
+import re
+import threading
 import logging
-import xml.etree.ElementTree as ET
+from bisect import bisect_left
+from functools import lru_cache
+from types import MappingProxyType
+
+try:
+    import pybase64
+except ImportError:  # pybase64 is optional; fall back to the standard library.
+    pybase64 = None
+
+if pybase64 is not None:
+    # SIMD-accelerated codec; b64encode_as_string returns str directly.
+    _b64encode = pybase64.b64encode_as_string
+else:
+    def _b64encode(data):
+        return base64.b64encode(data).decode('ascii')
+
+try:
+    # Use the C encoder directly when cbor2 ships it as a separate extension module.
+    from _cbor2 import CBOREncoder
+except ImportError:
+    from cbor2 import CBOREncoder
 
 """
 This module handles the data processing for QR code generation. It provides functions to:
@@ -21,6 +43,31 @@ Note: For any compression method (zlib, gzip, or cbor), Base64 encoding is autom
 For plain text (method "none"), the data is left unchanged.
 """
 
+logger = logging.getLogger(__name__)
+
+# Per-thread CBOR encoder and output buffer, reused across calls (see _cbor_dumps()).
+_cbor_state = threading.local()
+
+def _cbor_dumps(obj):
+    """
+    Encode an object to CBOR bytes using a reusable encoder.
+
+    Each thread (and each batch worker process) keeps one CBOREncoder writing into one BytesIO
+    buffer, which is rewound for every call instead of creating a new encoder and buffer per payload.
+
+    :param obj: The object to encode.
+    :return: The CBOR-encoded bytes.
+    """
+    encoder = getattr(_cbor_state, "encoder", None)
+    if encoder is None:
+        _cbor_state.buffer = io.BytesIO()
+        _cbor_state.encoder = encoder = CBOREncoder(_cbor_state.buffer)
+    buffer = _cbor_state.buffer
+    buffer.seek(0)
+    buffer.truncate()
+    encoder.encode(obj)
+    return buffer.getvalue()
+
 def process_data(data, method):
     """
     Process input data based on the selected method.
@@ -37,8 +84,8 @@ def process_data(data, method):
     :param method: One of "none", "zlib", "gzip", or "cbor".
     :return: Processed data as a string.
     """
-    original_bytes = data.encode('utf-8')
-    logging.debug(f"[process_data] Original Data Size: {len(original_bytes)} bytes | Method: {method}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("[process_data] Original Data Size: %d bytes | Method: %s", len(data.encode('utf-8')), method)
 
     if method == "none":
         return data
@@ -46,10 +93,10 @@ def process_data(data, method):
     if method == "cbor":
         try:
             # Parse input as JSON then dump it as CBOR bytes.
-            data = cbor2.dumps(json.loads(data))
-            logging.debug(f"[process_data] CBOR Encoded Size: {len(data)} bytes")
+            data = _cbor_dumps(json.loads(data))
+            logger.debug("[process_data] CBOR Encoded Size: %d bytes", len(data))
         except Exception as e:
-            logging.error(f"[process_data] CBOR Encoding Failed: {e}")
+            logger.error("[process_data] CBOR Encoding Failed: %s", e)
             return None
     else:
         # For gzip or zlib, encode text to bytes.
@@ -57,62 +104,87 @@ def process_data(data, method):
 
     if method == "gzip":
         data = gzip.compress(data)
-        logging.debug(f"[process_data] Data compressed with gzip: {len(data)} bytes")
+        logger.debug("[process_data] Data compressed with gzip: %d bytes", len(data))
     elif method == "zlib":
         data = zlib.compress(data)
-        logging.debug(f"[process_data] Data compressed with zlib: {len(data)} bytes")
+        logger.debug("[process_data] Data compressed with zlib: %d bytes", len(data))
 
     # Always apply Base64 encoding for compressed data.
     try:
-        data = base64.b64encode(data).decode('utf-8')
-        logging.debug(f"[process_data] Data Base64 encoded: {len(data.encode('utf-8'))} bytes")
+        data = _b64encode(data)
+        logger.debug("[process_data] Data Base64 encoded: %d bytes", len(data))  # Base64 is ASCII
     except Exception as e:
-        logging.error(f"[process_data] Base64 Encoding Failed: {e}")
+        logger.error("[process_data] Base64 Encoding Failed: %s", e)
         return None
 
     return data
     
+# QR Code capacity table (approximate maximum number of bytes that can be encoded) for each QR version and error correction level.
+# Each row is an ascending tuple, so the smallest fitting version can be found with a binary search.
+_QR_CAPACITY = {
+    "L": (25, 47, 77, 114, 154, 195, 224, 279, 335, 395, 468, 535, 619, 667, 758, 854, 938, 1046, 1153, 1249,
+          1352, 1460, 1588, 1704, 1853, 1990, 2132, 2223, 2369, 2520, 2677, 2840, 3009, 3183, 3351, 3537, 3729,
+          3927, 4087, 4296),
+    "M": (20, 38, 61, 90, 122, 154, 178, 221, 262, 311, 366, 419, 483, 528, 600, 656, 734, 816, 909, 970,
+          1035, 1134, 1248, 1326, 1451, 1542, 1637, 1732, 1839, 1994, 2113, 2238, 2369, 2506, 2632, 2780, 2923,
+          3057, 3220, 3391),
+    "Q": (16, 29, 47, 67, 87, 108, 125, 157, 189, 221, 259, 296, 336, 366, 419, 450, 512, 568, 614, 664,
+          718, 754, 808, 871, 911, 985, 1033, 1115, 1171, 1231, 1286, 1354, 1426, 1502, 1582, 1666, 1754,
+          1846, 1942, 2042),
+    "H": (10, 20, 35, 50, 64, 84, 93, 122, 143, 174, 200, 227, 259, 283, 321, 365, 408, 452, 493, 535,
+          593, 625, 658, 698, 742, 790, 842, 898, 958, 983, 1051, 1093, 1139, 1219, 1273, 1322, 1367, 1465,
+          1528, 1594)
+}
+
 def determine_optimal_qr_version(data, compression_method, error_correction_level):
     """
     Determine the smallest QR version (1 to 40) that can hold the data.
     
     This is based on a capacity table for different error correction levels.
     
-    :param data: The (uncompressed) data as a string.
+    :param data: The data as a string, or the size of the payload in bytes as an integer (e.g. the
+                 length of the already processed payload, which avoids encoding it again).
     :param compression_method: (Not used in this calculation)
     :param error_correction_level: One of "L", "M", "Q", or "H".
     :return: The optimal QR version as an integer.
     """
-    # QR Code capacity table (approximate maximum number of bytes that can be encoded) for each QR version and error correction level.
-    qr_capacity = {
-        "L": [25, 47, 77, 114, 154, 195, 224, 279, 335, 395, 468, 535, 619, 667, 758, 854, 938, 1046, 1153, 1249,
-              1352, 1460, 1588, 1704, 1853, 1990, 2132, 2223, 2369, 2520, 2677, 2840, 3009, 3183, 3351, 3537, 3729,
-              3927, 4087, 4296],
-        "M": [20, 38, 61, 90, 122, 154, 178, 221, 262, 311, 366, 419, 483, 528, 600, 656, 734, 816, 909, 970,
-              1035, 1134, 1248, 1326, 1451, 1542, 1637, 1732, 1839, 1994, 2113, 2238, 2369, 2506, 2632, 2780, 2923,
-              3057, 3220, 3391],
-        "Q": [16, 29, 47, 67, 87, 108, 125, 157, 189, 221, 259, 296, 336, 366, 419, 450, 512, 568, 614, 664,
-              718, 754, 808, 871, 911, 985, 1033, 1115, 1171, 1231, 1286, 1354, 1426, 1502, 1582, 1666, 1754,
-              1846, 1942, 2042],
-        "H": [10, 20, 35, 50, 64, 84, 93, 122, 143, 174, 200, 227, 259, 283, 321, 365, 408, 452, 493, 535,
-              593, 625, 658, 698, 742, 790, 842, 898, 958, 983, 1051, 1093, 1139, 1219, 1273, 1322, 1367, 1465,
-              1528, 1594]
-    }
-    
-    # Measure the data size in bytes (using UTF-8 encoding).
-    data_length = len(data.encode('utf-8'))
+    # Measure the data size in bytes (using UTF-8 encoding) unless a byte count was given.
+    # ASCII text is one byte per character, so it does not need to be encoded.
+    if isinstance(data, int):
+        data_length = data
+    elif data.isascii():
+        data_length = len(data)
+    else:
+        data_length = len(data.encode('utf-8'))
     
-    # Retrieve the capacity list for the given error correction level; default to "M" if not found.
-    capacities = qr_capacity.get(error_correction_level, qr_capacity["M"])
+    # Retrieve the capacity table for the given error correction level; default to "M" if not found.
+    capacities = _QR_CAPACITY.get(error_correction_level, _QR_CAPACITY["M"])
     
-    # Iterate through versions 1 to 40 (the list length) to find the smallest version
-    # where the data_length fits within the capacity.
-    for version, capacity in enumerate(capacities, start=1):
-        if data_length <= capacity:
-            return version
+    # Find the smallest version whose capacity is at least data_length. If the data exceeds
+    # the capacity of even version 40, fall back to 40.
+    version = bisect_left(capacities, data_length) + 1
+    return min(version, 40)
 
-    # Fallback: if the data exceeds the capacity of even version 40, return 40.
-    return 40
+@lru_cache(maxsize=32)
+def _build_qr(data, qr_version, error_correction, box_size, border):
+    """
+    Build and lay out a QRCode object for the given payload and settings.
+
+    The result is cached, so regenerating the same payload reuses the already computed matrix
+    instead of repeating the error correction encoding and the evaluation of all 8 mask patterns.
+    Callers must not add data to the returned object.
+
+    :return: A QRCode object on which make() has been called.
+    """
+    qr = qrcode.QRCode(
+        version=qr_version,
+        error_correction=error_correction,
+        box_size=box_size,
+        border=border
+    )
+    qr.add_data(data)
+    qr.make(fit=True)
+    return qr
 
 def generate_qr_code(data, qr_version=1, error_correction=qrcode.constants.ERROR_CORRECT_M, box_size=4, border=4):
     """
@@ -125,16 +197,13 @@ def generate_qr_code(data, qr_version=1, error_correction=qrcode.constants.ERROR
     :param border: Width of the border.
     :return: A PIL Image of the generated QR code.
     """
-    qr = qrcode.QRCode(
-        version=qr_version,
-        error_correction=error_correction,
-        box_size=box_size,
-        border=border
-    )
-    qr.add_data(data)
-    qr.make(fit=True)
+    qr = _build_qr(data, qr_version, error_correction, box_size, border)
     return qr.make_image(fill_color="black", back_color="white")
 
+# Start of every SVG written by generate_svg(), up to and including the background rectangle.
+_SVG_HEADER = (b'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 %d %d" width="%d" height="%d">'
+               b'<rect width="100%%" height="100%%" fill="white" />')
+
 def generate_svg(qr, file_path):
     """
     Generate an optimized SVG file from the given QR code object.
@@ -147,10 +216,16 @@ def generate_svg(qr, file_path):
     The SVG is created with a background white rectangle and a single <path> element 
     that draws all the black modules.
     
-    :param qr: A QRCode object that has been prepared (using qrcode.QRCode).
+    :param qr: A QRCode object that has been prepared (using qrcode.QRCode), or an image returned
+               by generate_qr_code(). Only its 'modules' matrix is used, so an already generated
+               image can be passed directly without encoding the data again.
     :param file_path: The path where the SVG file will be saved.
     """
 
+    # NumPy is only needed here; importing it lazily keeps it out of the start-up of modules
+    # (such as the GUI) that import qr_processor but may never write an SVG.
+    import numpy as np
+
    # Retrieve the QR code matrix (a 2D list of booleans indicating black/white modules).
     qr_matrix = qr.modules
     size = len(qr_matrix)
@@ -158,46 +233,54 @@ def generate_svg(qr, file_path):
     # Define the pixel size for each module. This determines the overall resolution.
     pixel_size = 4
     svg_size = size * pixel_size
-    viewBox = f"0 0 {size} {size}"
     
-    # Create the SVG root element.
-    svg = ET.Element("svg", xmlns="http://www.w3.org/2000/svg", viewBox=viewBox,
-                     width=str(svg_size), height=str(svg_size))
-    
-    # Add a white background rectangle.
-    ET.SubElement(svg, "rect", width="100%", height="100%", fill="white")
-    
-    # Build a list of path commands that represent contiguous black modules.
-    path_commands = []
-    # Iterate through each row of the QR matrix.
-    for y, row in enumerate(qr_matrix):
-        x = 0
-        while x < len(row):
-            if row[x]:
-                # Found the beginning of a contiguous block of black modules.
-                start_x = x
-                while x < len(row) and row[x]:
-                    x += 1
-                width = x - start_x
-                """
-                Create a rectangle for this block:
-                  - M{start_x},{y} moves to the starting module,
-                  - h{width} draws a horizontal line covering the contiguous block,
-                  - v1 draws a vertical line down one module,
-                  - h-{width} draws a horizontal line back to the starting x position,
-                  - z closes the path.
-                """
-                path_commands.append(f"M{start_x},{y}h{width}v1h-{width}z")
-            else:
-                x += 1
-    # If any black modules were found, create a single <path> element.
-    if path_commands:
-        path_data = " ".join(path_commands)
-        ET.SubElement(svg, "path", d=path_data, fill="black")
-    
-    # Write the final SVG tree to the specified file.
-    tree = ET.ElementTree(svg)
-    tree.write(file_path)
+    # Locate runs of contiguous black modules for the whole matrix at once. Each row is padded
+    # with a white module on both sides so that np.diff yields +1 at every run start and -1 just
+    # past every run end; np.nonzero returns both in row-major order, so they pair up.
+    matrix = np.asarray(qr_matrix, dtype=np.int8)
+    edges = np.diff(np.pad(matrix, ((0, 0), (1, 1))), axis=1)
+    rows, starts = np.nonzero(edges == 1)
+    widths = np.nonzero(edges == -1)[1] - starts
+    """
+    Create a rectangle for each block:
+      - M{start_x},{y} moves to the starting module,
+      - h{width} draws a horizontal line covering the contiguous block,
+      - v1 draws a vertical line down one module,
+      - h-{width} draws a horizontal line back to the starting x position,
+      - z closes the path.
+    """
+    # Every coordinate and width lies in 0..size, so the command pieces are encoded once per value
+    # and each command is assembled from three pre-encoded byte strings.
+    numbers = [str(n).encode("ascii") for n in range(size + 1)]
+    moves = [b"M" + n + b"," for n in numbers]           # M{start_x},
+    lines = [n + b"h" for n in numbers]                  # {y}h
+    blocks = [n + b"v1h-" + n + b"z" for n in numbers]   # {width}v1h-{width}z
+    path_commands = [moves[x] + lines[y] + blocks[w]
+                     for y, x, w in zip(rows.tolist(), starts.tolist(), widths.tolist())]
+    # The document only ever contains integers, so it is written directly instead of being built
+    # as an XML tree and serialised: the SVG root element, a white background rectangle and, if
+    # any black modules were found, a single <path> element.
+    with open(file_path, "wb") as f:
+        f.write(_SVG_HEADER % (size, size, svg_size, svg_size))
+        if path_commands:
+            f.write(b'<path d="')
+            f.write(b" ".join(path_commands))
+            f.write(b'" fill="black" />')
+        f.write(b"</svg>")
+
+# SVG files smaller than this (in bytes) are minified in-process instead of being passed to SVGO.
+SVGO_MIN_SIZE = 8192
+
+# Patterns used by minify_svg().
+_SVG_COMMENT_RE = re.compile(r"<!--.*?-->", re.DOTALL)
+_SVG_INTERTAG_WHITESPACE_RE = re.compile(r">\s+<")
+_SVG_SELF_CLOSING_RE = re.compile(r"\s+/>")
+# fill="black" on a <path> restates the SVG default fill.
+_SVG_PATH_BLACK_FILL_RE = re.compile(r'(<path\b[^>]*?)\s+fill="black"')
+_SVG_PATH_DATA_RE = re.compile(r'(<path\b[^>]*?\sd=")([^"]*)(")')
+# Path data as written by generate_svg(): one closed rectangle per run of black modules.
+_SVG_RECT_PATH_RE = re.compile(r"(?:M\d+,\d+h\d+v1h-\d+z\s*)+")
+_SVG_RECT_RE = re.compile(r"M(\d+),(\d+)(h\d+v1h-\d+z)")
 
 def optimise_svg(svg_file_path):
     """
@@ -227,9 +310,61 @@ def optimise_svg(svg_file_path):
     try:
         # Run the SVGO command on the specified SVG file.
         subprocess.run(["svgo", svg_file_path], check=True, shell=True)
-        logging.debug(f"SVG optimized successfully: {svg_file_path}")
+        logger.debug("SVG optimized successfully: %s", svg_file_path)
     except Exception as e:
-        logging.error(f"SVG optimisation failed: {e}")
+        logger.error("SVG optimisation failed: %s", e)
+
+def _shorten_rect_path(match):
+    """
+    Rewrite generate_svg() path data with relative moves and without separators.
+
+    Each rectangle ends with 'z', which returns to its starting point, so the next one can be
+    reached with a relative 'm' by the difference in coordinates. A leading relative move is
+    treated as absolute, so the first rectangle needs no special case.
+
+    :param match: Match of _SVG_PATH_DATA_RE.
+    :return: The path element prefix, the shortened path data and the closing quote.
+    """
+    path_data = match.group(2)
+    if not _SVG_RECT_PATH_RE.fullmatch(path_data):
+        return match.group(0)
+    pieces = []
+    prev_x = prev_y = 0
+    for x, y, rect in _SVG_RECT_RE.findall(path_data):
+        x, y = int(x), int(y)
+        pieces.append(f"m{x - prev_x},{y - prev_y}{rect}")
+        prev_x, prev_y = x, y
+    return match.group(1) + "".join(pieces) + match.group(3)
+
+def minify_svg(svg_file_path):
+    """
+    Minify the SVG file in-process.
+
+    XML comments, whitespace between tags and before '/>' and fill="black" on paths (the default
+    fill) are removed, and path data written by generate_svg() is rewritten with relative moves
+    and no separators, which makes a typical QR code SVG around 15% smaller.
+
+    This is a lightweight alternative to optimise_svg() for small files, where starting the
+    external SVGO process costs far more time than the bytes it would save.
+
+    :param svg_file_path: The file path to the SVG file that should be minified.
+    """
+    try:
+        with open(svg_file_path, "r", encoding="utf-8") as f:
+            svg_text = f.read()
+        svg_text = _SVG_COMMENT_RE.sub("", svg_text)
+        svg_text = _SVG_INTERTAG_WHITESPACE_RE.sub("><", svg_text).strip()
+        svg_text = _SVG_SELF_CLOSING_RE.sub("/>", svg_text)
+        svg_text = _SVG_PATH_BLACK_FILL_RE.sub(r"\1", svg_text)
+        svg_text = _SVG_PATH_DATA_RE.sub(_shorten_rect_path, svg_text)
+        with open(svg_file_path, "w", encoding="utf-8") as f:
+            f.write(svg_text)
+        logger.debug("SVG minified successfully: %s", svg_file_path)
+    except Exception as e:
+        logger.error("SVG minification failed: %s", e)
+
+# Shared default for missing nested objects (station_start, station_end, holder); never mutated.
+_EMPTY = MappingProxyType({})
 
 def extract_essential_ticket_details(json_data):
     """
@@ -238,25 +373,28 @@ def extract_essential_ticket_details(json_data):
     :param json_data: Dictionary with full ticket data.
     :return: Dictionary containing only essential fields.
     """
+    get = json_data.get
+    holder = get("holder", _EMPTY)
     extracted = {
-        "provider": json_data.get("provider", ""),
-        "ticket_id": json_data.get("ticket_id", ""),
-        "ticket_type": json_data.get("ticket_type", ""),
-        "departure_time": json_data.get("departure_time", ""),
-        "arrival_time": json_data.get("arrival_time", ""),
-        "train": f"{json_data.get('train_number', '')} ({json_data.get('train_operator', '')})",
-        "from": json_data.get("station_start", {}).get("name", ""),
-        "to": json_data.get("station_end", {}).get("name", ""),
-        "coach": json_data.get("coach", ""),
-        "seat": json_data.get("seat_number", ""),
-        "class": json_data.get("class", ""),
-        "price": f"{json_data.get('price', 0.00)} {json_data.get('currency', '')}",
-        "status": json_data.get("payment_status", ""),
-        "reference": json_data.get("reference_number", ""),
-        "passenger": f"{json_data.get('holder', {}).get('first_name', '')} {json_data.get('holder', {}).get('last_name', '')}",
-        "security_hash": json_data.get("security_hash", "")
+        "provider": get("provider", ""),
+        "ticket_id": get("ticket_id", ""),
+        "ticket_type": get("ticket_type", ""),
+        "departure_time": get("departure_time", ""),
+        "arrival_time": get("arrival_time", ""),
+        "train": f"{get('train_number', '')} ({get('train_operator', '')})",
+        "from": get("station_start", _EMPTY).get("name", ""),
+        "to": get("station_end", _EMPTY).get("name", ""),
+        "coach": get("coach", ""),
+        "seat": get("seat_number", ""),
+        "class": get("class", ""),
+        "price": f"{get('price', 0.00)} {get('currency', '')}",
+        "status": get("payment_status", ""),
+        "reference": get("reference_number", ""),
+        "passenger": f"{holder.get('first_name', '')} {holder.get('last_name', '')}",
+        "security_hash": get("security_hash", "")
     }
-    logging.debug(f"Extracted data: {extracted}")
+    # Formatting the whole dict is only worth it when the record will actually be emitted.
+    logger.debug("Extracted data: %s", extracted)
     return extracted
 
 def encode_ticket_details_to_cbor(json_string, use_base64=True):
@@ -271,14 +409,14 @@ def encode_ticket_details_to_cbor(json_string, use_base64=True):
     try:
         json_data = json.loads(json_string)
         essential_data = extract_essential_ticket_details(json_data)
-        cbor_encoded = cbor2.dumps(essential_data)
-        logging.debug(f"[encode_ticket_details_to_cbor] CBOR encoded data size: {len(cbor_encoded)} bytes")
+        cbor_encoded = _cbor_dumps(essential_data)
+        logger.debug("[encode_ticket_details_to_cbor] CBOR encoded data size: %d bytes", len(cbor_encoded))
         if use_base64:
-            b64_encoded = base64.b64encode(cbor_encoded).decode('utf-8')
-            logging.debug(f"[encode_ticket_details_to_cbor] Base64 encoded CBOR size: {len(b64_encoded.encode('utf-8'))} bytes")
+            b64_encoded = _b64encode(cbor_encoded)
+            logger.debug("[encode_ticket_details_to_cbor] Base64 encoded CBOR size: %d bytes", len(b64_encoded))
             return b64_encoded
         else:
             return cbor_encoded
     except Exception as e:
-        logging.error(f"[encode_ticket_details_to_cbor] Failed to encode to CBOR: {e}")
+        logger.error("[encode_ticket_details_to_cbor] Failed to encode to CBOR: %s", e)
         return None
\ No newline at end of file
@@ -10,6 +10,17 @@ This module contains functions to assess the quality of a generated QR code and
 an image of a QR code for better scanning.
 """
 
+def _to_gray_array(image):
+    """
+    Return a grayscale NumPy array for a PIL Image or an array that is already grayscale.
+
+    :param image: A PIL Image or a 2D NumPy array.
+    :return: A 2D uint8 NumPy array.
+    """
+    if isinstance(image, np.ndarray):
+        return image
+    return np.asarray(image.convert("L"))
+
 def check_qr_quality(qr_img):
     """
     Assess QR Code quality by evaluating several criteria:
@@ -37,39 +48,35 @@ def check_qr_quality(qr_img):
 
     The function returns a multi-line string with these metrics.
 
-    :param qr_img: A PIL Image of the QR code.
+    :param qr_img: A PIL Image of the QR code, or a 2D uint8 NumPy array holding it in grayscale.
     :return: A string with the quality assessment.
     """
-    # Convert the image to grayscale.
-    gray_img = qr_img.convert("L")
-    gray_array = np.array(gray_img)
+    # Convert the image to grayscale (arrays are assumed to be grayscale already).
+    gray_array = _to_gray_array(qr_img)
 
     # Define a threshold to distinguish dark (QR modules) and light areas.
     threshold = 128
-    # Separate pixels into light and dark groups.
-    white_pixels = gray_array[gray_array >= threshold]
-    dark_pixels = gray_array[gray_array < threshold]
+    # Build a 256-bin intensity histogram in one pass; all pixel statistics are derived from it.
+    counts = np.bincount(gray_array.ravel(), minlength=256).astype(np.int64)
+    levels = np.arange(256, dtype=np.int64)
+    dark_n = counts[:threshold].sum()
+    white_n = counts[threshold:].sum()
 
     # Compute the average intensity for each group.
-    white_avg = np.mean(white_pixels) if white_pixels.size > 0 else 255
-    dark_avg = np.mean(dark_pixels) if dark_pixels.size > 0 else 0
+    white_avg = (counts[threshold:] @ levels[threshold:]) / white_n if white_n > 0 else 255
+    dark_avg = (counts[:threshold] @ levels[:threshold]) / dark_n if dark_n > 0 else 0
 
     # Contrast Ratio is defined as the difference between the average white and dark values.
     contrast = white_avg - dark_avg
 
     # Verify quiet zone by checking that all border pixels exceed a high brightness threshold.
     quiet_threshold = 230  # Expect very high brightness for a proper quiet zone.
-    top_border = gray_array[0, :]
-    bottom_border = gray_array[-1, :]
-    left_border = gray_array[:, 0]
-    right_border = gray_array[:, -1]
-    quiet_zone_present = (np.all(top_border > quiet_threshold) and
-                          np.all(bottom_border > quiet_threshold) and
-                          np.all(left_border > quiet_threshold) and
-                          np.all(right_border > quiet_threshold))
+    border_min = min(gray_array[0].min(), gray_array[-1].min(),
+                     gray_array[:, 0].min(), gray_array[:, -1].min())
+    quiet_zone_present = border_min > quiet_threshold
 
     # Calculate the data density (proportion of dark pixels).
-    data_density = np.sum(gray_array < threshold) / gray_array.size
+    data_density = dark_n / (dark_n + white_n)
 
     # Compute a heuristic readability score (e.g., subtract a factor of the data density from 100).
     readability_score = 100 - (data_density * 80)
@@ -83,18 +90,30 @@ def check_qr_quality(qr_img):
     )
     return quality_info
 
-def optimize_qr_for_scanning(image):
+def _is_binary(gray):
+    """
+    Check whether a grayscale image contains only pure black (0) and pure white (255) pixels.
+
+    :param gray: A 2D uint8 NumPy array.
+    :return: True if no intermediate gray levels are present.
+    """
+    return not np.bincount(gray.ravel(), minlength=256)[1:255].any()
+
+def optimize_qr_for_scanning(image, return_array=False):
     """
     Enhance QR code image quality by:
       - Converting the image to grayscale (if not already).
+      - Returning already binarised images (only pure black and white pixels) unchanged.
       - Applying histogram equalisation.
       - Applying adaptive thresholding to improve contrast.
     
-    :param image: A PIL Image.
-    :return: An optimized PIL Image suitable for scanning.
+    :param image: A PIL Image, or a NumPy array (grayscale, RGB or RGBA).
+    :param return_array: If True, return the optimized grayscale NumPy array instead of
+                         wrapping it in a PIL Image (e.g. to pass it on to check_qr_quality()).
+    :return: An optimized PIL Image (or NumPy array) suitable for scanning.
     """
-    # Convert the PIL image to a numpy array and ensure it is of type uint8.
-    np_img = np.array(image).astype(np.uint8)
+    # Convert the image to a numpy array and ensure it is of type uint8 (no copy if it already is).
+    np_img = np.asarray(image, dtype=np.uint8)
     
     # If the image already has one channel (grayscale), use it directly.
     if np_img.ndim == 2:
@@ -108,9 +127,19 @@ def optimize_qr_for_scanning(image):
     else:
         # Fallback: if channels are unknown, attempt a default conversion.
         gray = cv2.cvtColor(np_img, cv2.COLOR_BGR2GRAY)
-    
-    # Apply histogram equalisation and adaptive thresholding.
-    gray = cv2.equalizeHist(gray)
-    gray = cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
-                                 cv2.THRESH_BINARY, 11, 2)
-    return Image.fromarray(gray)
+
+    # Images made by generate_qr_code() are already pure black and white, so there is nothing to
+    # enhance; return them unchanged instead of running both filters.
+    if _is_binary(gray):
+        out = gray
+    else:
+        # A grayscale input array belongs to the caller, so write into a separate buffer; a
+        # converted image is our own copy and can be overwritten in place.
+        out = np.empty_like(gray) if gray is np_img else gray
+        # Apply histogram equalisation and adaptive thresholding, both writing into the same buffer.
+        cv2.equalizeHist(gray, dst=out)
+        cv2.adaptiveThreshold(out, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
+                              cv2.THRESH_BINARY, 11, 2, dst=out)
+    if return_array:
+        return out
+    return Image.fromarray(out)
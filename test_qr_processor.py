@@ -8,18 +8,35 @@ import cbor2
 import qrcode
 import numpy as np
 from qr_processor import (
-    process_data, determine_optimal_qr_version, generate_qr_code,
+    process_data, determine_optimal_qr_version, generate_qr_code, generate_svg, minify_svg,
     extract_essential_ticket_details, encode_ticket_details_to_cbor
 )
-from qr_decoder import decompress_data, decode_qr_image, decode_qr_data
+from qr_decoder import decompress_data, decode_qr_image, decode_qr_data, is_base64_string
 from qr_quality import check_qr_quality, optimize_qr_for_scanning
+from qr_json import json_loads, json_dumps, json_dumps_pretty
 from PIL import Image
 
 import logging
+import logging.handlers
+import queue
+import atexit
 import io
 import tempfile
 import os
+import sys
 import textwrap
+import re
+from functools import lru_cache
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the standard library.
+    orjson = None
+
+try:
+    import gui
+except ImportError:  # gui.py needs Tkinter, which is not installed everywhere.
+    gui = None
 
 """
 This module contains unit tests for the QR processing functions.
@@ -29,49 +46,88 @@ Logging enhancements:
   - A base class (LoggedTestCase) logs a friendly header for each test.
   - Separator lines clearly mark test boundaries.
   - Multi-line log messages are dedented and then uniformly indented by 4 spaces.
+  - Only warnings and errors are logged by default. Set QR_TEST_LEVEL=DEBUG to write the full
+    debug log to unittest.log (any logging level name is accepted).
+  - Under pytest no log file is written (pytest captures the records); set QR_TEST_LOG_FORCE=1
+    to write it anyway.
 """
 
 # Define a custom formatter that dedents and re-indents multi-line messages.
 class IndentFormatter(logging.Formatter):
+    # Continuation lines are indented to line up with the message text after the
+    # "%(asctime)s - %(levelname)s - " prefix.
+    LINE_BREAK = "\n" + " " * 34
     def format(self, record):
         message = super().format(record)
-        lines = message.splitlines()
-        if len(lines) > 1:
-            # Dedent the subsequent lines, then indent them by 4 spaces.
-            block = "\n".join(lines[1:])
+        if "\n" not in message:
+            # Single-line messages need no re-indenting.
+            return message
+        first_line, _, block = message.partition("\n")
+        if block[:1] in (" ", "\t"):
+            # Only a block whose first line is indented can have common leading whitespace.
             block = textwrap.dedent(block)
-            indented_block = textwrap.indent(block, "                                  ")
-            message = lines[0] + "\n" + indented_block
-        return message
+        return first_line + self.LINE_BREAK + block.replace("\n", self.LINE_BREAK)
+
+# Logging level for the test run, taken from QR_TEST_LEVEL (default: WARNING).
+LOG_LEVEL = getattr(logging, os.environ.get("QR_TEST_LEVEL", "WARNING").upper(), logging.WARNING)
+
+# Log file for this process: QR_TEST_LOG if set, otherwise unittest.log. Parallel pytest-xdist
+# workers each get their own file (e.g. unittest-gw0.log) instead of truncating a shared one.
+_xdist_worker = os.environ.get("PYTEST_XDIST_WORKER")
+LOG_FILENAME = os.environ.get(
+    "QR_TEST_LOG", f"unittest-{_xdist_worker}.log" if _xdist_worker else "unittest.log")
+
+# pytest captures log records itself and reports them for failing tests, so the log file is only
+# written for other runners (e.g. python -m unittest), unless QR_TEST_LOG or QR_TEST_LOG_FORCE=1
+# asks for it.
+WRITE_LOG_FILE = ("pytest" not in sys.modules or "QR_TEST_LOG" in os.environ
+                  or os.environ.get("QR_TEST_LOG_FORCE") == "1")
 
-# Configure logging with the custom formatter.
-log_handler = logging.FileHandler("unittest.log", mode="w", encoding="utf-8")
-log_handler.setLevel(logging.DEBUG)
-log_formatter = IndentFormatter("%(asctime)s - %(levelname)s - %(message)s")
-log_handler.setFormatter(log_formatter)
 root_logger = logging.getLogger()
 root_logger.handlers = []  # Clear any default handlers.
-root_logger.addHandler(log_handler)
-root_logger.setLevel(logging.DEBUG)
+# Below LOG_LEVEL, logging calls return before a log record is even created.
+root_logger.setLevel(LOG_LEVEL)
+if WRITE_LOG_FILE:
+    # Configure logging with the custom formatter.
+    log_handler = logging.FileHandler(LOG_FILENAME, mode="w", encoding="utf-8")
+    log_handler.setLevel(LOG_LEVEL)
+    log_formatter = IndentFormatter("%(asctime)s - %(levelname)s - %(message)s")
+    log_handler.setFormatter(log_formatter)
+    # Tests only enqueue records; a background listener formats them and writes the file.
+    log_queue = queue.SimpleQueue()
+    root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    log_listener = logging.handlers.QueueListener(log_queue, log_handler, respect_handler_level=True)
+    log_listener.start()
+    atexit.register(log_listener.stop)  # Flush the remaining records before the file is closed.
+else:
+    # Keep records from reaching logging's last-resort stderr handler.
+    root_logger.addHandler(logging.NullHandler())
+
+# process_data() is deterministic and returns immutable strings, so tests that process the same
+# (payload, method) pair share one result instead of compressing the payload again.
+@lru_cache(maxsize=256)
+def process_data_cached(payload, method):
+    return process_data(payload, method=method)
 
-# A custom logging handler to capture log records for test verification.
-class LogCaptureHandler(logging.Handler):
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.records = []
-    def emit(self, record):
-        self.records.append(record)
+# Directory for temporary image files: a RAM-backed filesystem when available (Linux).
+RAM_TEMP_DIR = "/dev/shm" if os.path.isdir("/dev/shm") else None
+
+# Separator line that marks test boundaries in the log.
+SEPARATOR = "=" * 80
 
 # Base class to add friendly logging for each test.
 class LoggedTestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # Use the class name as the logger name; it is looked up once per class.
+        cls.logger = logging.getLogger(cls.__name__)
     def setUp(self):
-        # Use the class name as the logger name.
-        self.logger = logging.getLogger(self.__class__.__name__)
         # Compute a friendly test name from the full test id.
         self.friendly_name = self.friendly_test_name(self.id())
-        self.logger.debug("=" * 80)
+        self.logger.debug(SEPARATOR)
         self.logger.debug("Test: %s", self.friendly_name)
-        self.logger.debug("=" * 80)
+        self.logger.debug(SEPARATOR)
         self.logger.debug("# Starting test: %s", self.id())
     def tearDown(self):
         self.logger.debug("# Finished test: %s", self.id())
@@ -87,66 +143,61 @@ class LoggedTestCase(unittest.TestCase):
 # Now update each test class to inherit from LoggedTestCase.
 
 class TestQRProcessingWithLogs(LoggedTestCase):
-    def setUp(self):
-        super().setUp()
-        # Setup custom log capture handler.
-        self.log_handler = LogCaptureHandler()
-        self.log_handler.setLevel(logging.DEBUG)
-        self.logger.addHandler(self.log_handler)
-        self.payload = "This is a test payload for QR code generation."
-    def tearDown(self):
-        super().tearDown()
-        self.logger.removeHandler(self.log_handler)
-        # Optionally dump captured logs if errors occurred.
-        error_logs = [r for r in self.log_handler.records if r.levelno >= logging.ERROR]
-        if error_logs:
-            for record in self.log_handler.records:
-                self.logger.error("Captured log: %s", record.getMessage())
-
+    payload = "This is a test payload for QR code generation."
     def test_no_error_logs_plaintext(self):
-        self.logger.debug("Testing process_data and decompress_data with plaintext payload.")
-        processed = process_data(self.payload, method="none")
-        self.logger.debug("Processed output: %s", processed)
-        decompressed = decompress_data(processed, method="none")
-        self.logger.debug("Decompressed output: %s", decompressed)
+        # Capture the records of every logger (including qr_processor and qr_decoder) on the root logger.
+        with self.assertLogs(level=logging.DEBUG) as captured:
+            self.logger.debug("Testing process_data and decompress_data with plaintext payload.")
+            processed = process_data(self.payload, method="none")
+            self.logger.debug("Processed output: %s", processed)
+            decompressed = decompress_data(processed, method="none")
+            self.logger.debug("Decompressed output: %s", decompressed)
         self.assertEqual(decompressed, self.payload)
-        error_logs = [r for r in self.log_handler.records if r.levelno >= logging.ERROR]
-        self.assertEqual(len(error_logs), 0, "There were error messages in the logs.")
+        error_logs = [r.getMessage() for r in captured.records if r.levelno >= logging.ERROR]
+        self.assertEqual(error_logs, [], "There were error messages in the logs.")
 
 class TestQRProcessing(LoggedTestCase):
-    def setUp(self):
-        super().setUp()
-        self.txt_data = "This is a sample plain text for testing QR code generation."
-        self.json_data = json.dumps({"message": "Hello, world!", "value": 42})
-    def test_plaintext_no_compression_no_base64(self):
-        self.logger.debug("Starting test_plaintext_no_compression_no_base64 with data: %s", self.txt_data)
-        processed = process_data(self.txt_data, method="none")
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.txt_data = "This is a sample plain text for testing QR code generation."
+        cls.json_obj = {"message": "Hello, world!", "value": 42}
+        cls.json_data = json.dumps(cls.json_obj)
+    def _round_trip(self, payload, method, decompress_method="auto"):
+        # Process the payload, decompress it again and return both results.
+        processed = process_data_cached(payload, method)
         self.logger.debug("Processed data: \n%s", processed)
-        decompressed = decompress_data(processed, method="none")
+        decompressed = decompress_data(processed, method=decompress_method)
         self.logger.debug("Decompressed data: \n%s", decompressed)
+        return processed, decompressed
+    def test_plaintext_no_compression_no_base64(self):
+        self.logger.debug("Starting test_plaintext_no_compression_no_base64 with data: %s", self.txt_data)
+        processed, decompressed = self._round_trip(self.txt_data, "none", decompress_method="none")
         self.assertEqual(processed, self.txt_data)
         self.assertEqual(decompressed, self.txt_data)
     def test_plaintext_with_zlib_and_base64(self):
         self.logger.debug("Starting test_plaintext_with_zlib_and_base64 with data: %s", self.txt_data)
-        processed = process_data(self.txt_data, method="zlib")
-        self.logger.debug("Processed data: \n%s", processed)
-        decompressed = decompress_data(processed, method="auto")
-        self.logger.debug("Decompressed data: \n%s", decompressed)
+        _, decompressed = self._round_trip(self.txt_data, "zlib")
         self.assertEqual(decompressed, self.txt_data)
     def test_plaintext_with_gzip_and_base64(self):
         self.logger.debug("Starting test_plaintext_with_gzip_and_base64 with data: %s", self.txt_data)
-        processed = process_data(self.txt_data, method="gzip")
-        self.logger.debug("Processed data: \n%s", processed)
-        decompressed = decompress_data(processed, method="auto")
-        self.logger.debug("Decompressed data: \n%s", decompressed)
+        _, decompressed = self._round_trip(self.txt_data, "gzip")
         self.assertEqual(decompressed, self.txt_data)
     def test_json_with_cbor_and_base64(self):
         self.logger.debug("Starting test_json_with_cbor_and_base64 with data: %s", self.json_data)
-        processed = process_data(self.json_data, method="cbor")
-        self.logger.debug("Processed data: \n%s", processed)
-        decompressed = decompress_data(processed, method="auto")
-        self.logger.debug("Decompressed data: \n%s", decompressed)
-        self.assertEqual(json.loads(decompressed), json.loads(self.json_data))
+        _, decompressed = self._round_trip(self.json_data, "cbor")
+        # The decoder pretty-prints the JSON, so compare parsed objects rather than strings.
+        self.assertEqual(json.loads(decompressed), self.json_obj)
+    def test_json_with_big_integers(self):
+        self.logger.debug("Starting test_json_with_big_integers")
+        # Integers beyond 64 bits must survive decoding exactly rather than turning into floats.
+        big_obj = {"id": 123456789012345678901234567890, "low": -(2 ** 63) - 1, "value": 42}
+        big_data = json.dumps(big_obj)
+        for decompress_method in ("cbor", "auto"):
+            with self.subTest(decompress_method=decompress_method):
+                _, decompressed = self._round_trip(big_data, "cbor", decompress_method=decompress_method)
+                self.assertEqual(json.loads(decompressed), big_obj)
+        self.assertEqual(json.loads(decode_qr_data(big_data)), big_obj)
     def test_generate_qr_image_returns_pil(self):
         self.logger.debug("Starting test_generate_qr_image_returns_pil with data: %s", self.txt_data)
         processed = process_data(self.txt_data, method="none")
@@ -168,39 +219,100 @@ class TestQRProcessing(LoggedTestCase):
         version_large = determine_optimal_qr_version(large_text, "none", "M")
         self.logger.debug("Optimal QR version for large text: %s", version_large)
         self.assertTrue(version_small < version_large)
+    def test_determine_optimal_qr_version_from_length(self):
+        self.logger.debug("Starting test_determine_optimal_qr_version_from_length")
+        for text in ("Short text", "A" * 1000, "你好，世界" * 20):
+            with self.subTest(length=len(text)):
+                from_text = determine_optimal_qr_version(text, "none", "M")
+                from_length = determine_optimal_qr_version(len(text.encode("utf-8")), "none", "M")
+                self.assertEqual(from_text, from_length)
     def test_decode_qr_image(self):
         self.logger.debug("Starting test_decode_qr_image")
         payload = "Test payload for QR decoding."
         processed = process_data(payload, method="none")
         self.logger.debug("Processed payload: %s", processed)
         qr_img = generate_qr_code(processed, qr_version=1, error_correction=qrcode.constants.ERROR_CORRECT_M)
-        with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as tmp:
-            tmp_filename = tmp.name
-            qr_img.save(tmp_filename, optimize=True)
+        # decode_qr_image() reads from a path, so keep the file in RAM where possible and save it
+        # with fast compression (the PNG size does not matter here).
+        fd, tmp_filename = tempfile.mkstemp(suffix=".png", dir=RAM_TEMP_DIR)
+        os.close(fd)
+        try:
+            qr_img.save(tmp_filename, compress_level=1)
             self.logger.debug("Saved QR image to temporary file: %s", tmp_filename)
-        decoded = decode_qr_image(tmp_filename)
-        self.logger.debug("Decoded payload from QR image: %s", decoded)
-        os.remove(tmp_filename)
-        self.logger.debug("Removed temporary file: %s", tmp_filename)
+            decoded = decode_qr_image(tmp_filename)
+            self.logger.debug("Decoded payload from QR image: %s", decoded)
+        finally:
+            os.remove(tmp_filename)
+            self.logger.debug("Removed temporary file: %s", tmp_filename)
         self.assertEqual(decoded, payload)
+    def test_generate_svg_from_qr_image(self):
+        self.logger.debug("Starting test_generate_svg_from_qr_image with data: %s", self.txt_data)
+        qr_img = generate_qr_code(self.txt_data, qr_version=1, error_correction=qrcode.constants.ERROR_CORRECT_M)
+        qr_obj = qrcode.QRCode(version=1, error_correction=qrcode.constants.ERROR_CORRECT_M, box_size=4, border=4)
+        qr_obj.add_data(self.txt_data)
+        qr_obj.make(fit=True)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            from_image = os.path.join(tmp_dir, "from_image.svg")
+            from_qr = os.path.join(tmp_dir, "from_qr.svg")
+            generate_svg(qr_img, from_image)
+            generate_svg(qr_obj, from_qr)
+            with open(from_image, encoding="utf-8") as f1, open(from_qr, encoding="utf-8") as f2:
+                svg_from_image, svg_from_qr = f1.read(), f2.read()
+        self.logger.debug("SVG generated from image: %d characters", len(svg_from_image))
+        self.assertEqual(svg_from_image, svg_from_qr)
+    def test_minify_svg(self):
+        self.logger.debug("Starting test_minify_svg with data: %s", self.txt_data)
+        qr_obj = qrcode.QRCode(version=1, error_correction=qrcode.constants.ERROR_CORRECT_M, box_size=4, border=4)
+        qr_obj.add_data(self.txt_data)
+        qr_obj.make(fit=True)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            svg_path = os.path.join(tmp_dir, "qr.svg")
+            generate_svg(qr_obj, svg_path)
+            original_size = os.path.getsize(svg_path)
+            minify_svg(svg_path)
+            with open(svg_path, encoding="utf-8") as f:
+                minified = f.read()
+        self.logger.debug("SVG minified from %d to %d characters", original_size, len(minified))
+        self.assertLess(len(minified), original_size)
+        self.assertNotIn('fill="black"', minified)
+        # Replay the relative moves and check that the path still covers exactly the black modules.
+        path_data = minified.split(' d="', 1)[1].split('"', 1)[0]
+        drawn = set()
+        x = y = 0
+        for dx, dy, width in re.findall(r"m(-?\d+),(\d+)h(\d+)v1h-\d+z", path_data):
+            x, y = x + int(dx), y + int(dy)
+            drawn.update((y, col) for col in range(x, x + int(width)))
+        expected = {(row, col) for row, line in enumerate(qr_obj.modules) for col, black in enumerate(line) if black}
+        self.assertEqual(drawn, expected)
+    def test_is_base64_string(self):
+        self.logger.debug("Starting test_is_base64_string")
+        for value, expected in (("QUJD", True), ("QQ==", True), ("  QUJD\n", True), ("", False),
+                                ("QUJ", False), ("Q===", False), ("QU=D", False), ("QUJ!", False)):
+            with self.subTest(value=value):
+                self.assertEqual(is_base64_string(value), expected)
     def test_auto_detection_with_zlib(self):
         self.logger.debug("Starting test_auto_detection_with_zlib with data: %s", self.txt_data)
-        processed = process_data(self.txt_data, method="zlib")
-        self.logger.debug("Processed data: \n%s", processed)
-        decompressed = decompress_data(processed, method="auto")
-        self.logger.debug("Decompressed data: \n%s", decompressed)
+        _, decompressed = self._round_trip(self.txt_data, "zlib")
         self.assertEqual(decompressed, self.txt_data)
+    def test_auto_detection_with_cbor_zlib_like_header(self):
+        self.logger.debug("Starting test_auto_detection_with_cbor_zlib_like_header")
+        # CBOR text strings of these lengths start with the same two bytes as a zlib stream.
+        for length in (94, 156, 218):
+            with self.subTest(length=length):
+                json_data = json.dumps("a" * (length - 2))
+                _, decompressed = self._round_trip(json_data, "cbor")
+                self.assertEqual(json.loads(decompressed), json.loads(json_data))
 
 class TestQRQuality(LoggedTestCase):
-    def setUp(self):
-        super().setUp()
-        self.img = Image.new("RGB", (100, 100), "white")
-        for x in range(100):
-            self.img.putpixel((x, 0), (0, 0, 0))
-            self.img.putpixel((x, 99), (0, 0, 0))
-        for y in range(100):
-            self.img.putpixel((0, y), (0, 0, 0))
-            self.img.putpixel((99, y), (0, 0, 0))
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # The image is only read by the tests, so it is built once for the class.
+        # A white 100x100 image with a one-pixel black border.
+        arr = np.full((100, 100, 3), 255, dtype=np.uint8)
+        arr[0, :] = arr[-1, :] = 0
+        arr[:, 0] = arr[:, -1] = 0
+        cls.img = Image.fromarray(arr)  # (100, 100, 3) uint8 -> RGB
     def test_check_qr_quality_returns_expected_format(self):
         self.logger.debug("Starting test_check_qr_quality_returns_expected_format")
         quality_str = check_qr_quality(self.img)
@@ -213,11 +325,22 @@ class TestQRQuality(LoggedTestCase):
         optimized_img = optimize_qr_for_scanning(self.img)
         self.logger.debug("Obtained optimised image.")
         self.assertIsInstance(optimized_img, Image.Image)
+    def test_quality_pipeline_accepts_numpy_arrays(self):
+        self.logger.debug("Starting test_quality_pipeline_accepts_numpy_arrays")
+        gray_array = np.asarray(self.img.convert("L"))
+        optimized_array = optimize_qr_for_scanning(gray_array, return_array=True)
+        self.assertIsInstance(optimized_array, np.ndarray)
+        quality_from_array = check_qr_quality(optimized_array)
+        quality_from_image = check_qr_quality(optimize_qr_for_scanning(self.img))
+        self.logger.debug("QR quality string from array: %s", quality_from_array)
+        self.assertEqual(quality_from_array, quality_from_image)
 
 class TestTicketEncoding(LoggedTestCase):
-    def setUp(self):
-        super().setUp()
-        self.full_json = {
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # Shared, read-only fixture: the ticket and its JSON serialisation are built once.
+        cls.full_json = {
             "provider": "TRAIN TICKET COMPANY",
             "ticket_id": "78433201",
             "ticket_type": "Full",
@@ -247,7 +370,13 @@ class TestTicketEncoding(LoggedTestCase):
             "holder": {"holder_id": "CUST-568902", "first_name": "John", "last_name": "Doe"},
             "security_hash": "La=oPG9h2uHdh3jqA194GMKw1K4=KXUJ+oq4Uh1IoXxZ+D6hHOzZ42w/gEdNGgGCo08/HHOnc=yyC=eytxHAPDMOphsPKUHMvnqgu3tWtdfjYRBQlHfNATrlh6sL1h1TpnZ7cV0gBOx+dVXmAemO+pRfH=PCyxDzFdcrzLGu+G/a=XX+bnBHO+eSiN9KyS76Df=Z9OiXSYyg5bB+d+XFVo=0u0OGPcReJ5DUody3f6vDYdy8srLv49n3=xVjoQIg"
         }
-        self.json_string = json.dumps(self.full_json)
+        if orjson is not None:
+            cls.json_string = orjson.dumps(cls.full_json).decode("utf-8")
+        else:
+            cls.json_string = json.dumps(cls.full_json)
+        # The expected Base64 CBOR encoding of the essential details, computed once.
+        essential = extract_essential_ticket_details(cls.full_json)
+        cls.expected_cbor_b64 = base64.b64encode(cbor2.dumps(essential)).decode("ascii")
     def test_extract_essential(self):
         self.logger.debug("Starting test_extract_essential")
         essential = extract_essential_ticket_details(self.full_json)
@@ -265,16 +394,13 @@ class TestTicketEncoding(LoggedTestCase):
         encoded = encode_ticket_details_to_cbor(self.json_string, use_base64=True)
         self.logger.debug("Encoded CBOR string: %s", encoded)
         self.assertIsInstance(encoded, str)
-        decoded_bytes = base64.b64decode(encoded.encode('utf-8'))
-        decoded = cbor2.loads(decoded_bytes)
-        essential = extract_essential_ticket_details(self.full_json)
-        self.logger.debug("Decoded CBOR to: %s", decoded)
-        self.assertEqual(decoded, essential)
+        self.assertEqual(encoded, self.expected_cbor_b64)
 
 class TestRoundTripPlainText(LoggedTestCase):
-    def setUp(self):
-        super().setUp()
-        self.payloads = [
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.payloads = (
             "This is a test payload for QR code generation.",
             "¡Hola! ¿Cómo estás?",
             "Привіт, як справи?",
@@ -285,17 +411,55 @@ class TestRoundTripPlainText(LoggedTestCase):
             "Line1\nLine2\nLine3",
             "Payload: #$%^&*() - Testing, 1, 2, 3!",
             "1234567890" * 10
-        ]
+        )
     def test_combinations_plaintext(self):
         self.logger.debug("Starting test_combinations_plaintext for multiple payloads")
         for payload in self.payloads:
             with self.subTest(payload=payload):
                 self.logger.debug("Testing payload:\n%s", payload)
-                processed = process_data(payload, method="none")
+                processed = process_data_cached(payload, "none")
                 self.logger.debug("Processed data:\n%s", processed)
                 decompressed = decompress_data(processed, method="none")
                 self.logger.debug("Decompressed data:\n%s", decompressed)
                 self.assertEqual(decompressed, payload)
 
+class TestJson(LoggedTestCase):
+    def test_loads_dumps_keep_json_exact(self):
+        self.logger.debug("Starting test_loads_dumps_keep_json_exact")
+        # Big integers and NaN are valid for json but not for orjson; they must not be altered
+        # or make the payload fall back to plain text.
+        for text in ('{"id":123456789012345678901234567890,"value":42}',
+                     '{"low":-9223372036854775809}', '{"value":NaN}', '[Infinity,null]',
+                     '{"name":"Café","value":null,"nullable":true}'):
+            with self.subTest(text=text):
+                self.assertEqual(json_dumps(json_loads(text)), text)
+    def test_dumps_pretty_matches_json_module(self):
+        self.logger.debug("Starting test_dumps_pretty_matches_json_module")
+        # The displayed JSON must not depend on whether orjson is installed.
+        for obj in ({"name": "Café", "value": None, "items": [1, 2.5]}, {1: "int key", "big": 2 ** 64},
+                    {"value": float("nan"), "low": float("-inf")}):
+            with self.subTest(obj=obj):
+                self.assertEqual(json_dumps_pretty(obj), json.dumps(obj, indent=2, ensure_ascii=False))
+
+@unittest.skipIf(gui is None, "Tkinter is not available")
+class TestGuiBatch(LoggedTestCase):
+    def test_process_one_reports_errors(self):
+        self.logger.debug("Starting test_process_one_reports_errors")
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            opts = {"debug": False, "use_case": "test", "compression": "zlib", "auto_version": True,
+                    "error_correction": "M", "fast_png": True, "output_folder": tmp_dir}
+            input_path = os.path.join(tmp_dir, "input.txt")
+            with open(input_path, "w", encoding="utf-8") as f:
+                f.write("Batch payload")
+            ok, save_path, error = gui._process_one(input_path, opts)
+            self.assertTrue(ok)
+            self.assertTrue(os.path.isfile(save_path))
+            self.assertIsNone(error)
+            # Worker processes do not log; the failure comes back for the GUI process to log.
+            ok, save_path, error = gui._process_one(os.path.join(tmp_dir, "missing.txt"), opts)
+            self.assertFalse(ok)
+            self.assertIsNone(save_path)
+            self.assertIn("missing.txt", error)
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file